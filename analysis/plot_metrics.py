@@ -2,18 +2,20 @@
 """
 plot_metrics.py
 ------------------------------------------------------
-Plots SRCL environmental metrics from metrics_log.jsonl
+Plots SRCL environmental metrics from metrics_log.{jsonl,bin,parquet}
 ------------------------------------------------------
 """
 
-import json
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from srcl_core.metrics_sink import read_metrics
+
 # === Locate latest log file ===
 log_dir = Path("data/logs")
-log_files = sorted(log_dir.glob("metrics_log.jsonl"))
+log_files = sorted(log_dir.glob("metrics_log.*"), key=lambda p: p.stat().st_mtime)
 
 if not log_files:
     raise FileNotFoundError("❌ No log files found in data/logs/ — run srcl_environmental_ripple.py first.")
@@ -21,16 +23,8 @@ if not log_files:
 log_path = log_files[-1]
 print(f"📂 Using log file: {log_path}")
 
-# === Load JSONL log file ===
-data = []
-with open(log_path, "r") as f:
-    for line in f:
-        try:
-            data.append(json.loads(line.strip()))
-        except json.JSONDecodeError:
-            continue
-
-df = pd.DataFrame(data)
+# === Load log file (JSONL, binary or Parquet) ===
+df = read_metrics(str(log_path))
 print(f"✅ Loaded {len(df)} entries")
 
 # === Compute rolling averages for smooth visualization ===
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+ripple_step_benchmark.py
+------------------------------------------------------
+Environmental ripple step: the original np.roll array form vs the fused
+ripple_step kernel. Checks that both give the same fields and reports the
+transient bytes allocated per step (tracemalloc peak above the live fields)
+and the time per step.
+------------------------------------------------------
+Run from the repo root:  python analysis/ripple_step_benchmark.py
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from srcl_core.srcl_environmental_ripple import (
+    Da, Db, DEFAULT_PARAMS, environment_wave, feed, initial_fields, kill, ripple_step,
+)
+
+SIZE = 200
+STEPS = 300
+GAMMA = DEFAULT_PARAMS["gamma"]
+
+
+def roll_step(A, B, E, t, gamma=GAMMA):
+    """The ripple update as it was written with np.roll (reference)."""
+    laplace_A = (
+        np.roll(A, 1, 0) + np.roll(A, -1, 0) +
+        np.roll(A, 1, 1) + np.roll(A, -1, 1) - 4 * A
+    )
+    laplace_B = (
+        np.roll(B, 1, 0) + np.roll(B, -1, 0) +
+        np.roll(B, 1, 1) + np.roll(B, -1, 1) - 4 * B
+    )
+    dA = Da * laplace_A - A * B**2 + feed * (1 - A)
+    dB = Db * laplace_B + A * B**2 - (kill + feed) * B
+    A += dA * 0.1
+    B += dB * 0.1
+    E = environment_wave(t) * np.ones_like(E)
+    A += gamma * E
+    return np.clip(A, 0, 1), np.clip(B, 0, 1), E
+
+
+def run_roll(steps):
+    A, B = initial_fields(SIZE)
+    E = np.zeros((SIZE, SIZE))
+    for t in range(steps):
+        A, B, E = roll_step(A, B, E, t)
+    return A, B
+
+
+def run_fused(steps):
+    A, B = initial_fields(SIZE)
+    A_next, B_next = np.empty_like(A), np.empty_like(B)
+    for t in range(steps):
+        ripple_step(A, B, A_next, B_next, Da, Db, feed, kill, GAMMA * environment_wave(t))
+        A, A_next = A_next, A
+        B, B_next = B_next, B
+    return A, B
+
+
+def step_allocations(name):
+    """Largest tracemalloc peak above the live state over 20 steps, in bytes."""
+    A, B = initial_fields(SIZE)
+    E = np.zeros((SIZE, SIZE))
+    A_next, B_next = np.empty_like(A), np.empty_like(B)
+    worst = 0
+    tracemalloc.start()
+    for t in range(20):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        if name == "np.roll":
+            A, B, E = roll_step(A, B, E, t)
+        else:
+            ripple_step(A, B, A_next, B_next, Da, Db, feed, kill, GAMMA * environment_wave(t))
+            A, A_next = A_next, A
+            B, B_next = B_next, B
+        _, peak = tracemalloc.get_traced_memory()
+        worst = max(worst, peak - baseline)
+    tracemalloc.stop()
+    return worst
+
+
+def main():
+    run_fused(1) # Compile (or load the cached kernel) before timing
+
+    A_ref, B_ref = run_roll(STEPS)
+    A_new, B_new = run_fused(STEPS)
+    diff = max(np.abs(A_ref - A_new).max(), np.abs(B_ref - B_new).max())
+    print(f"{SIZE}x{SIZE}, {STEPS} steps: max |difference| = {diff:.1e}"
+          f" ({'bit-identical' if np.array_equal(A_ref, A_new) and np.array_equal(B_ref, B_new) else 'differs'})")
+
+    print(f"{'step':<10} {'bytes/step':>12} {'ms/step':>9}")
+    for name, run in (("np.roll", run_roll), ("fused", run_fused)):
+        started = time.perf_counter()
+        run(STEPS)
+        ms = (time.perf_counter() - started) / STEPS * 1e3
+        print(f"{name:<10} {step_allocations(name):>12,} {ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
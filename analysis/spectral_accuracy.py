@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+spectral_accuracy.py
+------------------------------------------------------
+Explicit Euler vs the spectral integrator (srcl_core.spectral) for the
+continuity / SRCL models at their default parameters, without noise.
+Reference: explicit Euler with a 20x finer dt over the same time span.
+Reports the relative L2 error of the final field and the wall time.
+------------------------------------------------------
+Run from the repo root:  python analysis/spectral_accuracy.py
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from continuity_field_sim import run_continuity_sim
+from srcl import run_srcl_memory
+from srcl_q import run_srcl_quantum as run_srcl_q
+from srcl_m import run_srcl_quantum as run_srcl_m_quantum
+from srcl_mq import run_srcl_mq
+
+REFINE = 20 # Reference dt = default dt / REFINE
+DT_FACTORS = (1, 2, 5, 10) # Both schemes run at these multiples of the default dt
+SEED = 7
+
+
+def continuity_final(steps, dt, method, D=0.2):
+    snapshots = run_continuity_sim(steps=steps, dt=dt, D=D, noise=0.0, method=method, snapshot_every=max(steps - 1, 1))
+    return snapshots[-1]
+
+
+# name -> (final field of run(steps, dt, method), default steps, default dt).
+# The continuity PDE itself blows up near t = 1.2 (the βC³ term, any dt), so it is
+# compared at t = 1; "continuity_D3" is the stiff case (D = 3, Euler needs dt < 0.08).
+MODELS = {
+    "continuity": (continuity_final, 10, 0.1),
+    "continuity_D3": (lambda s, dt, m: continuity_final(s, dt, m, D=3.0), 10, 0.1),
+    "srcl": (lambda s, dt, m: run_srcl_memory(steps=s, dt=dt, noise=0.0, method=m, plot_every=0)[0], 600, 0.02),
+    "srcl_q": (lambda s, dt, m: run_srcl_q(steps=s, dt=dt, noise=0.0, method=m, plot_every=0)[0], 600, 0.015),
+    "srcl_m": (lambda s, dt, m: run_srcl_m_quantum(steps=s, dt=dt, noise=0.0, method=m, plot_every=0)[0], 600, 0.015),
+    "srcl_mq": (lambda s, dt, m: run_srcl_mq(steps=s, dt=dt, noise=0.0, method=m, plot_every=0)[0], 600, 0.015),
+}
+
+
+def timed_run(run, steps, dt, method):
+    np.random.seed(SEED) # Same initial field for every run
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), np.errstate(all="ignore"):
+        field = run(steps, dt, method)
+    return field, time.perf_counter() - started
+
+
+def relative_error(field, reference):
+    if not np.all(np.isfinite(field)):
+        return np.inf
+    return float(np.linalg.norm(field - reference) / np.linalg.norm(reference))
+
+
+def main():
+    print(f"{'model':<14} {'method':<9} {'dt':>8} {'steps':>6} {'rel. L2 error':>14} {'seconds':>8}")
+    for name, (run, steps, dt) in MODELS.items():
+        reference, _ = timed_run(run, steps * REFINE, dt / REFINE, "euler")
+        cases = [("euler", k) for k in DT_FACTORS] + [("spectral", k) for k in DT_FACTORS]
+        for method, k in cases:
+            field, seconds = timed_run(run, steps // k, dt * k, method)
+            error = relative_error(field, reference)
+            shown = "diverged" if not np.isfinite(error) else f"{error:.2e}"
+            print(f"{name:<14} {method:<9} {dt * k:>8.3f} {steps // k:>6} {shown:>14} {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,16 +10,32 @@ import random
 import json
 import os
 import sys
-import pandas as pd
+import time
 import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from srcl_core.backtest_engine import QuantEngine
+from srcl_core.backtest_engine import QuantEngine, MultiAssetEngine, MIN_TRADES
+from srcl_core.fitness_cache import FitnessCache
+from srcl_core.parallel_eval import ParallelEvaluator
+from srcl_core.search import GenomeSpace, BACKENDS, print_target_report
+from srcl_core.surrogate import Surrogate
+from srcl_core.checkpoint import save_checkpoint, load_checkpoint, get_random_state, set_random_state
+from srcl_core.islands import run_islands
 
 # CONFIGURATION
 POPULATION_SIZE = 50
 GENERATIONS = 30
 ASSETS = ["BTC-USD", "ETH-USD", "SOL-USD"]
+FITNESS_CACHE_FILE = "data/optimizer/hydra_fitness_cache.json" # Set to None to keep scores in memory only
+WORKERS = os.cpu_count() or 1 # >1 scores generations on a shared-memory process pool
+BACKEND = "ga" # "ga" (truncation GA below), "de" or "cmaes" (array genomes, srcl_core.search)
+TARGET_FITNESS = None # Evaluations-to-target report level (None = this run's best)
+SURROGATE_KEEP = None # e.g. 0.5: only the best-predicted half of unseen genomes is backtested (helps ga/de, not cmaes)
+CHECKPOINT_FILE = "data/optimizer/hydra_checkpoint.npz" # Rewritten every generation; `--resume` continues from it
+ISLANDS = 1 # >1 evolves this many GA sub-populations in separate processes (island model; no --resume, BACKEND must be "ga", WORKERS unused)
+MIGRATION_INTERVAL = 5 # Generations between island migrations
+MIGRANTS = 2 # Top genomes each island sends per migration
+TOPOLOGY = "ring" # "ring" (to the next island) or "full" (to every other island)
 
 print(f"🐲 INITIALIZING SOFT HYDRA FOR: {ASSETS}")
 
@@ -34,6 +50,9 @@ for asset in ASSETS:
 if len(engines) < 1:
     sys.exit("🚨 FATAL: No data found.")
 
+# All assets stacked into one (assets x bars) tensor
+hydra = MultiAssetEngine(list(engines.values()))
+
 def generate_hydra_genome():
     sl_mult = random.uniform(2.0, 5.0) # Wider stops for crypto
     tp_mult = sl_mult * random.uniform(1.2, 4.0) 
@@ -49,6 +68,18 @@ def generate_hydra_genome():
         'tp_multiplier': tp_mult
     }
 
+# Same ranges as generate_hydra_genome; tp_multiplier is encoded as a multiple of the stop
+SEARCH_SPACE = GenomeSpace({
+    'w_trend': (0.1, 1.0),
+    'w_mean_rev': (0.1, 1.0),
+    'w_vol': (0.1, 1.0),
+    'rsi_period': (5, 20),
+    'buy_thresh': (0.05, 0.3),
+    'sell_thresh': (0.05, 0.3),
+    'sl_multiplier': (2.0, 5.0),
+    'tp_multiplier': (1.2, 4.0),
+}, integers=('rsi_period',), ratios={'tp_multiplier': 'sl_multiplier'})
+
 def mutate(genome):
     new_genome = genome.copy()
     if random.random() < 0.3: # Higher mutation rate
@@ -65,67 +96,232 @@ def mutate(genome):
         
     return new_genome
 
+def hydra_scores(stats):
+    """
+    Soft-constraint score from a (genomes x assets x STAT_COLUMNS) array,
+    summed over assets.
+    """
+    sharpe = stats[..., 0]
+    profit = stats[..., 1]
+    drawdown = stats[..., 2]
+    trades = stats[..., 3]
+
+    # SCORING LOGIC
+    asset_score = (sharpe
+                   - 5.0 * (profit < 0)      # Penalty for losing money
+                   - 5.0 * (drawdown < -35)  # Penalty for crashes
+                   - 2.0 * (trades < 30))    # Penalty for laziness
+
+    # HANDLE DEAD STRATEGIES: heavy penalty, but not death
+    asset_score = np.where(trades < MIN_TRADES, -20.0, asset_score)
+    return asset_score.sum(axis=-1)
+
+_worker_hydras = {}
+
+def hydra_objective(asset_engines, population, early_abort=True):
+    """Scores a whole generation on every asset in one MultiAssetEngine pass."""
+    key = tuple(asset_engines)
+    if key not in _worker_hydras:
+        _worker_hydras[key] = MultiAssetEngine(list(asset_engines.values()))
+    stats = _worker_hydras[key].evaluate_batch(population, early_abort=early_abort)
+    return [float(s) for s in hydra_scores(stats)]
+
+def evaluate_population(population, early_abort=True):
+    # Early abort only cuts assets that can no longer reach MIN_TRADES; they
+    # score the same -20 dead-asset penalty either way.
+    stats = hydra.evaluate_batch(population, early_abort=early_abort)
+    return [float(s) for s in hydra_scores(stats)]
+
 def evaluate_hydra(genome):
-    total_score = 0
-    
-    for asset, engine in engines.items():
-        stats = engine.run_backtest(genome, detailed_report=True)
-        
-        # 1. HANDLE DEAD STRATEGIES
-        if isinstance(stats, float): # If it returned -999.0
-            total_score -= 20.0 # Heavy penalty, but not death
-            continue
-            
-        sharpe = stats['Sharpe']
-        profit = stats['Total Return %']
-        drawdown = stats['Max Drawdown %']
-        trades = stats['Trades']
-        
-        # 2. SCORING LOGIC
-        asset_score = sharpe
-        
-        if profit < 0: 
-            asset_score -= 5.0 # Penalty for losing money
-        
-        if drawdown < -35:
-            asset_score -= 5.0 # Penalty for crashes
-            
-        if trades < 30:
-            asset_score -= 2.0 # Penalty for laziness
-            
-        total_score += asset_score
+    return evaluate_population([genome])[0]
 
-    return total_score
+def surrogate_summary(surrogate):
+    rho = "n/a" if surrogate.last_rank_corr is None else f"{surrogate.last_rank_corr:+.2f}"
+    return f" | Screened: {surrogate.last_screened} | Surrogate ρ: {rho}"
 
-def run_evolution():
+def evolve_island(migration, seed, known_scores):
+    """
+    One island of the island model: the truncation GA below on its own
+    population, swapping top genomes with its neighbours every
+    MIGRATION_INTERVAL generations. Runs in its own process.
+    """
+    random.seed(seed)
+    fingerprint = "|".join(engine.fingerprint() for engine in engines.values())
+    cache = FitnessCache(f"hydra-soft|{fingerprint}")
+    cache.scores.update(known_scores)
     population = [generate_hydra_genome() for _ in range(POPULATION_SIZE)]
     best_overall = -9999.0
     best_genome = None
-
-    print(f"\n🔥 SOFT HYDRA EVOLUTION STARTED")
-    print("-" * 60)
+    eval_seconds = 0.0
+    surrogate = Surrogate(SURROGATE_KEEP) if SURROGATE_KEEP else None
 
     for gen in range(1, GENERATIONS + 1):
-        scored_pop = []
-        for genome in population:
-            score = evaluate_hydra(genome)
-            scored_pop.append((genome, score))
-        
-        scored_pop.sort(key=lambda x: x[1], reverse=True)
-        
+        started, misses = time.perf_counter(), cache.misses
+        if surrogate:
+            scores = surrogate.evaluate(population, cache, evaluate_population)
+        else:
+            scores = cache.evaluate(population, evaluate_population)
+        elapsed = time.perf_counter() - started
+        eval_seconds += elapsed
+        scored_pop = sorted(zip(population, scores), key=lambda x: x[1], reverse=True)
+
         if scored_pop[0][1] > best_overall:
             best_overall = scored_pop[0][1]
             best_genome = scored_pop[0][0]
-            
-        print(f"Gen {gen:02d}: Best Score: {scored_pop[0][1]:.4f}")
-        
-        survivors = [s[0] for s in scored_pop[:15]] 
+
+        rate = (cache.misses - misses) / elapsed if elapsed > 0 else 0.0
+        print(f"🏝️ Island {migration.island} Gen {gen:02d}: Best Score: {scored_pop[0][1]:.4f} | {rate:,.0f} genomes/s", flush=True)
+
+        survivors = [s[0] for s in scored_pop[:15]]
         next_gen = survivors[:]
         while len(next_gen) < POPULATION_SIZE:
             next_gen.append(mutate(survivors[random.randint(0, len(survivors)-1)]))
+
+        # Immigrants replace the newest children
+        if gen % MIGRATION_INTERVAL == 0 and gen < GENERATIONS:
+            immigrants = migration.exchange([s[0] for s in scored_pop[:MIGRANTS]])
+            immigrants = immigrants[:POPULATION_SIZE - len(survivors)]
+            next_gen[len(next_gen) - len(immigrants):] = immigrants
         population = next_gen
 
+    return {
+        "best_genome": best_genome,
+        "best_score": best_overall,
+        "evaluations": cache.misses,
+        "seconds": eval_seconds,
+        "scores": {k: v for k, v in cache.scores.items() if k not in known_scores},
+    }
+
+def run_island_model():
+    """Runs ISLANDS copies of evolve_island and returns the best genome found."""
+    fingerprint = "|".join(engine.fingerprint() for engine in engines.values())
+    cache = FitnessCache(f"hydra-soft|{fingerprint}", path=FITNESS_CACHE_FILE)
+    seeds = [random.getrandbits(32) for _ in range(ISLANDS)]
+
+    print(f"\n🏝️ HYDRA ISLAND MODEL: {ISLANDS} islands | {TOPOLOGY} topology | "
+          f"{MIGRANTS} migrants every {MIGRATION_INTERVAL} gens")
+    print("-" * 60)
+    started = time.perf_counter()
+    results = run_islands(evolve_island, [(seed, cache.scores) for seed in seeds], TOPOLOGY)
+    elapsed = time.perf_counter() - started
+
+    print("-" * 60)
+    for island, result in enumerate(results):
+        rate = result["evaluations"] / result["seconds"] if result["seconds"] > 0 else 0.0
+        print(f"🏝️ Island {island}: Best Score: {result['best_score']:.4f} | "
+              f"{result['evaluations']} backtests in {result['seconds']:.1f}s ({rate:,.0f} genomes/s)")
+        cache.scores.update(result["scores"])
+    total = sum(result["evaluations"] for result in results)
+    print(f"⚡ All islands: {total} backtests in {elapsed:.1f}s wall ({total / elapsed:,.0f} genomes/s)")
+    cache.save()
+    return max(results, key=lambda result: result["best_score"])["best_genome"]
+
+def run_evolution(resume=False):
+    if ISLANDS > 1:
+        # Islands evolve GA populations in their own processes and keep no checkpoint
+        if resume:
+            sys.exit("🚨 FATAL: --resume is not supported with ISLANDS > 1 (islands write no checkpoint)")
+        if BACKEND != "ga":
+            sys.exit(f"🚨 FATAL: ISLANDS > 1 runs the GA backend only, set BACKEND = \"ga\" (got \"{BACKEND}\")")
+        if WORKERS > 1:
+            print(f"⚠️ ISLANDS > 1: each island is one process, WORKERS = {WORKERS} is not used")
+        report_winner(run_island_model())
+        return
+
+    strategy = BACKENDS[BACKEND](SEARCH_SPACE, POPULATION_SIZE) if BACKEND != "ga" else None
+    population = [generate_hydra_genome() for _ in range(POPULATION_SIZE)]
+    history = [] # (backtests run, best score) per generation
+    surrogate = Surrogate(SURROGATE_KEEP) if SURROGATE_KEEP else None
+    best_overall = -9999.0
+    best_genome = None
+    fingerprint = "|".join(engine.fingerprint() for engine in engines.values())
+    cache = FitnessCache(f"hydra-soft|{fingerprint}", path=FITNESS_CACHE_FILE)
+
+    start_gen = 1
+    if resume and os.path.exists(CHECKPOINT_FILE):
+        state = load_checkpoint(CHECKPOINT_FILE)
+        if state["backend"] == BACKEND:
+            start_gen = state["generation"] + 1
+            population = state["population"]
+            history = [tuple(h) for h in state["history"]]
+            best_overall, best_genome = state["best_score"], state["best_genome"]
+            cache.misses = state["evaluations"]
+            set_random_state(state["random_state"])
+            if strategy:
+                strategy.set_state({k[len("strategy."):]: v for k, v in state.items() if k.startswith("strategy.")})
+            if surrogate:
+                surrogate.set_state({k[len("surrogate."):]: v for k, v in state.items() if k.startswith("surrogate.")})
+            print(f"♻️ RESUMING from generation {start_gen}")
+        else:
+            print(f"⚠️ Checkpoint was written by the {state['backend']} backend, starting fresh")
+
+    print(f"\n🔥 SOFT HYDRA EVOLUTION STARTED ({BACKEND.upper()})")
     print("-" * 60)
+
+    evaluator = None
+    if WORKERS > 1:
+        evaluator = ParallelEvaluator(list(engines), objective=hydra_objective, workers=WORKERS)
+    score_fn = evaluator.map if evaluator else evaluate_population
+    try:
+        for gen in range(start_gen, GENERATIONS + 1):
+            if strategy:
+                population = SEARCH_SPACE.decode(strategy.ask())
+            if surrogate:
+                scores = surrogate.evaluate(population, cache, score_fn)
+            else:
+                scores = cache.evaluate(population, score_fn)
+            scored_pop = list(zip(population, scores))
+        
+            scored_pop.sort(key=lambda x: x[1], reverse=True)
+        
+            if scored_pop[0][1] > best_overall:
+                best_overall = scored_pop[0][1]
+                best_genome = scored_pop[0][0]
+            
+            line = f"Gen {gen:02d}: Best Score: {scored_pop[0][1]:.4f} | Cache Hits: {cache.last_hit_rate:.0%}"
+            if surrogate:
+                line += surrogate_summary(surrogate)
+            print(line)
+            history.append((cache.misses, best_overall))
+
+            if strategy:
+                strategy.tell(scores)
+            else:
+                survivors = [s[0] for s in scored_pop[:15]]
+                next_gen = survivors[:]
+                while len(next_gen) < POPULATION_SIZE:
+                    next_gen.append(mutate(survivors[random.randint(0, len(survivors)-1)]))
+                population = next_gen
+
+            checkpoint = {
+                "backend": BACKEND,
+                "generation": gen,
+                "population": population,
+                "scores": np.array(scores),
+                "history": history,
+                "best_score": best_overall,
+                "best_genome": best_genome,
+                "evaluations": cache.misses,
+                "random_state": get_random_state(),
+            }
+            if strategy:
+                checkpoint.update({f"strategy.{k}": v for k, v in strategy.get_state().items()})
+            if surrogate:
+                checkpoint.update({f"surrogate.{k}": v for k, v in surrogate.get_state().items()})
+            cache.save() # Resumed runs keep their cache hits
+            save_checkpoint(CHECKPOINT_FILE, checkpoint)
+    finally:
+        if evaluator:
+            evaluator.close()
+
+    print("-" * 60)
+    print_target_report({BACKEND: history}, TARGET_FITNESS)
+    cache.save()
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE) # Finished; the next run starts fresh
+    report_winner(best_genome)
+
+def report_winner(best_genome):
     print("🏆 HYDRA WINNER FOUND")
     
     # Save to disk
@@ -134,12 +330,11 @@ def run_evolution():
 
     # FINAL AUDIT (Crash Proof)
     print("\n📊 FINAL HYDRA AUDIT")
-    for asset, engine in engines.items():
-        stats = engine.run_backtest(best_genome, detailed_report=True)
-        if isinstance(stats, float):
+    for asset, (sharpe, profit, drawdown, trades) in zip(hydra.tickers, hydra.evaluate(best_genome)):
+        if trades < MIN_TRADES:
             print(f"🔹 {asset}: 💀 FAILED (Too few trades)")
         else:
-            print(f"🔹 {asset}: Return {stats['Total Return %']:.1f}% | DD {stats['Max Drawdown %']:.1f}% | Trades {stats['Trades']} | Sharpe {stats['Sharpe']:.2f}")
+            print(f"🔹 {asset}: Return {profit:.1f}% | DD {drawdown:.1f}% | Trades {int(trades)} | Sharpe {sharpe:.2f}")
 
 if __name__ == "__main__":
-    run_evolution()
+    run_evolution(resume="--resume" in sys.argv)
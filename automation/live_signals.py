@@ -4,17 +4,25 @@ SRCL ELITE - LIVE SIGNAL GENERATOR
 1. Downloads latest Candle (Today).
 2. Loads your WINNING HYDRA PARAMETERS.
 3. Prints clear BUY/SELL instructions for BTC & ETH.
+
+Each asset keeps a StreamState snapshot (indicator windows + open position)
+in data/live/, so a run only downloads and ingests the bars since the last
+one. Decisions come from the same execution step as the backtester.
 """
 import yfinance as yf
 import pandas as pd
-import numpy as np
 import json
 import os
 import sys
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from srcl_core.backtest_engine import QuantEngine
+from srcl_core.streaming import StreamState
+
 # 🏆 LOAD THE HYDRA WINNER
 PARAM_FILE = "automation/best_hydra_params.json"
+STATE_DIR = "data/live"
 
 if not os.path.exists(PARAM_FILE):
     print("🚨 ERROR: No strategy found. Run hydra_optimizer.py first.")
@@ -25,89 +33,69 @@ with open(PARAM_FILE, 'r') as f:
 
 ASSETS = ["BTC-USD", "ETH-USD"]
 
+def load_state(ticker):
+    """Snapshot from the last run, else a state warmed up on the backtest data."""
+    path = f"{STATE_DIR}/{ticker}_state.json"
+    if os.path.exists(path):
+        state = StreamState.load(path)
+        if state.params == PARAMS:
+            return state
+        print("   ♻️  Parameters changed, rebuilding state...")
+    try:
+        return StreamState.from_engine(QuantEngine(ticker), PARAMS)
+    except FileNotFoundError:
+        return StreamState(PARAMS)
+
 def get_live_signal(ticker):
     print(f"\n📡 ANALYZING {ticker}...")
-    
-    # Get enough data to calculate 200 SMA and RSI
-    df = yf.download(ticker, period="1y", interval="1d", progress=False)
-    
+    state = load_state(ticker)
+
+    # Only the bars we have not ingested yet (1y covers the 200 SMA warm-up)
+    if state.last_time is not None:
+        df = yf.download(ticker, start=state.last_time[:10], interval="1d", progress=False)
+    else:
+        df = yf.download(ticker, period="1y", interval="1d", progress=False)
+
     if isinstance(df.columns, pd.MultiIndex):
         df = df.xs(ticker, axis=1, level=1)
-    
-    # --- CALCULATE INDICATORS ---
-    # 1. 200 SMA (Regime Filter)
-    df['SMA_200'] = df['Close'].rolling(window=200).mean()
-    
-    # 2. RSI (Signal)
-    period = int(PARAMS['rsi_period'])
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    # 3. Volatility (ATR)
-    df['Log_Ret'] = np.log(df['Close'] / df['Close'].shift(1))
-    df['Vol_20'] = df['Log_Ret'].rolling(window=20).std() * np.sqrt(252)
-    df['ATR_Proxy'] = df['Close'] * df['Vol_20']
-    
-    # --- GET LATEST VALUES ---
-    latest = df.iloc[-1]
-    price = latest['Close']
-    sma = latest['SMA_200']
-    current_rsi = latest.iloc[-1] # RSI column index is complex, simplified here:
-    
-    # Re-calc RSI specifically for last row to be safe
-    current_rsi = rsi.iloc[-1]
-    current_atr = latest['ATR_Proxy']
-    
-    # --- LOGIC CORE ---
-    is_bull_regime = price > sma
-    
-    # Normalize RSI Signal (Same as Backtester)
-    # 50 = 0.0, 30 = 0.4, 70 = -0.4
-    rsi_signal = (50 - current_rsi) / 50 
-    
-    # Trend Signal
-    # We approximate trend signal based on price vs sma for live readout
-    trend_signal = 1.0 if is_bull_regime else -1.0
-    
-    # Vol Signal
-    vol_signal = 1.0 if latest['Vol_20'] < 0.04 else -1.0
-    
-    # FINAL SCORE
-    raw_score = (PARAMS['w_trend'] * trend_signal) + \
-                (PARAMS['w_mean_rev'] * rsi_signal) + \
-                (PARAMS['w_vol'] * vol_signal)
-    
-    # --- DECISION ---
+
+    if state.last_time is not None:
+        df = df[df.index > pd.Timestamp(state.last_time)]
+
+    # Completed candles update the saved state; today's candle is only previewed
+    for time, close in df['Close'].iloc[:-1].items():
+        state.update(close, str(time))
+    state.save(f"{STATE_DIR}/{ticker}_state.json")
+    if df.empty:
+        print(f"   ⚠️  No new candles since {str(state.last_time)[:10]}.")
+        return
+    latest = state.copy().update(df['Close'].iloc[-1], str(df.index[-1]))
+
     buy_thresh = PARAMS['buy_thresh']
-    sell_thresh = PARAMS['sell_thresh']
-    
-    print(f"   🔹 Price:      ${price:,.2f}")
-    print(f"   🔹 Regime:     {'🟢 BULL (Summer)' if is_bull_regime else '🔴 BEAR (Winter)'}")
-    print(f"   🔹 RSI ({period}):   {current_rsi:.1f}")
-    print(f"   🔹 Signal Strength: {raw_score:.3f} (Need > {buy_thresh:.3f})")
-    
-    # LOGIC CHECK
-    if raw_score > buy_thresh:
-        # Check Bear Market Filter
-        if not is_bull_regime and raw_score < 0.3:
-            print("   ⚠️  SIGNAL IGNORED: Weak Buy Signal in Bear Market.")
-            return
-            
+
+    print(f"   🔹 Price:      ${latest['price']:,.2f}")
+    print(f"   🔹 Regime:     {'🟢 BULL (Summer)' if latest['bull_regime'] else '🔴 BEAR (Winter)'}")
+    print(f"   🔹 RSI ({state.rsi_period}):   {latest['rsi']:.1f}")
+    print(f"   🔹 Signal Strength: {latest['signal']:.3f} (Need > {buy_thresh:.3f})")
+
+    # --- DECISION ---
+    action = latest['action']
+    if action == "BUY":
         print("   🚀 ACTION: >> BUY NOW <<")
-        
-        # Calculate Risk Levels
-        stop_loss = price - (current_atr * PARAMS['sl_multiplier'])
-        take_profit = price + (current_atr * PARAMS['tp_multiplier'])
-        
-        print(f"      🛡️ STOP LOSS:   ${stop_loss:,.2f}")
-        print(f"      🎯 TARGET:      ${take_profit:,.2f}")
+        print(f"      🛡️ STOP LOSS:   ${latest['stop']:,.2f}")
+        print(f"      🎯 TARGET:      ${latest['target']:,.2f}")
         print(f"      ⚖️ R:R RATIO:   1 : {PARAMS['tp_multiplier']/PARAMS['sl_multiplier']:.2f}")
-        
-    elif raw_score < -sell_thresh:
-        print("   🔻 ACTION: >> SELL / CLOSE <<")
+
+    elif action in ("SELL", "STOP LOSS", "TAKE PROFIT"):
+        print(f"   🔻 ACTION: >> SELL / CLOSE << ({action})")
+
+    elif action == "HOLD":
+        print(f"   📈 ACTION: HOLD (Long from ${latest['entry']:,.2f})")
+        print(f"      🛡️ STOP LOSS:   ${latest['stop']:,.2f}")
+        print(f"      🎯 TARGET:      ${latest['target']:,.2f}")
+
+    elif latest['signal'] > buy_thresh:
+        print("   ⚠️  SIGNAL IGNORED: Weak Buy Signal in Bear Market.")
     else:
         print("   💤 ACTION: HOLD / CASH (No Signal)")
 
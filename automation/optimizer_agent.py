@@ -1,70 +1,321 @@
-# --- AT THE TOP OF THE FILE ---
-import sys
+#!/usr/bin/env python3
+"""
+SRCL ELITE - OPTIMIZER AGENT
+----------------------------
+Long-running optimization service kept alive by watchdog_agent.py.
+1. One entry point, run_optimizer(objective), for any objective: a
+   GenomeSpace plus a batch `score(genomes) -> scores`. Built in: "strategy"
+   (QuantEngine backtest) and "physics" (SRCL environmental ripple).
+2. Each generation is scored once through a persisted FitnessCache, so
+   elites and repeated genomes are never re-evaluated.
+3. Per-generation stats are appended to a JSONL log (exported to Parquet at
+   the end of a run); state is checkpointed every generation and
+   `--resume` continues from it.
+4. The best genome goes to analysis/best_params.json (default objective) or
+   analysis/best_<objective>_params.json.
+
+Usage:
+    python automation/optimizer_agent.py --objective physics --resume
+"""
+import argparse
+import hashlib
+import json
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from rich.console import Console
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from srcl_core.backtest_engine import QuantEngine
+from srcl_core.fitness_cache import FitnessCache
+from srcl_core.search import GenomeSpace, ElitistGA, BACKENDS, STRATEGY_SPACE
+from srcl_core.checkpoint import save_checkpoint, load_checkpoint
+from srcl_core import metrics as field_metrics
+from srcl_core import srcl_environmental_ripple as ripple
+from srcl_core.srcl_environmental_ripple import run_ripple_ensemble
+
+# --- CONFIG ---
+OBJECTIVE = "physics" # "physics" or "strategy"
+BACKEND = "ga" # "ga" (ElitistGA), "de" or "cmaes"
+GENERATIONS = 20
+POPULATION_SIZE = 10
+WORKERS = os.cpu_count() or 1 # Parallel simulations / backtest processes
+OUTPUT_DIR = "data/optimizer" # agent_<objective>_{cache.json,checkpoint.npz,log.jsonl} live here
+PARQUET_LOG = True # Also export the JSONL log to agent_<objective>_log.parquet after each run
+TICKER = "BTC-USD"
+PHYSICS_FAILED = -999.0 # Score of a simulation that diverged (non-finite metrics) or produced no metrics
+
+STRATEGIES = {"ga": ElitistGA, **BACKENDS}
+# Modules whose code decides a physics score (the ripple model and its metric
+# kernels); their sources fingerprint the physics fitness cache
+PHYSICS_MODULES = (ripple, field_metrics)
+
+console = Console()
+
+
+class Objective:
+    def __init__(self, name, space, score, fingerprint, resource=None):
+        """
+        `score(genomes) -> scores` is called once per generation with the unseen
+        genomes. `resource` (e.g. a ParallelEvaluator) is closed by close().
+        """
+        self.name = name
+        self.space = space
+        self.score = score
+        self.fingerprint = fingerprint
+        self.resource = resource
+
+    def close(self):
+        if self.resource is not None:
+            self.resource.close()
+            self.resource = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-# Initialize Engine (Load data once to save speed)
-engine = QuantEngine("BTC-USD") # Or SPY, NVDA...
 
-# --- INSIDE YOUR EVALUATION LOOP ---
-def evaluate_genome(genome):
+# Only gamma enters ripple_step (alpha, beta and D just label a run): searching
+# the others would spend simulations on genomes with identical dynamics
+PHYSICS_GENES = ("gamma",)
+PHYSICS_SPACE = GenomeSpace({k: ripple.PARAM_RANGES[k] for k in PHYSICS_GENES})
+
+
+def strategy_objective(ticker=TICKER, workers=WORKERS):
     """
-    Decodes the DNA into trading parameters and asks the QuantEngine for the score.
+    run_backtest fitness on `ticker`. With workers > 1 it scores through a
+    shared-memory pool that stays open until the objective is closed.
     """
-    # 1. Decode Genome (Example mapping, adjust to your GA structure)
-    params = {
-        'w_trend': genome[0],      # Gene 0: Weight of Trend
-        'w_mean_rev': genome[1],   # Gene 1: Weight of RSI
-        'w_vol': genome[2],        # Gene 2: Weight of Volatility
-        'rsi_period': int(genome[3] * 30) + 5, # Map 0-1 to 5-35 period
-        'buy_thresh': genome[4],
-        'sell_thresh': genome[5]
+    from srcl_core.backtest_engine import QuantEngine
+    from srcl_core.parallel_eval import ParallelEvaluator
+
+    engine = QuantEngine(ticker=ticker)
+    fingerprint = f"agent|{engine.fingerprint()}"
+    if workers > 1:
+        evaluator = ParallelEvaluator([ticker], workers=workers)
+        return Objective("strategy", STRATEGY_SPACE, evaluator.map, fingerprint, resource=evaluator)
+    return Objective("strategy", STRATEGY_SPACE, engine.run_backtest_batch, fingerprint)
+
+
+def physics_score(metrics):
+    """Coherence per bit of entropy: high coherence, low entropy."""
+    if metrics is None:
+        return PHYSICS_FAILED
+    score = metrics["coherence"] / max(metrics["entropy"], 1e-9)
+    return score if np.isfinite(score) else PHYSICS_FAILED
+
+
+def _init_physics_worker():
+    # Parallelism comes from the pool; keep each worker's kernels single-threaded
+    import numba
+    numba.set_num_threads(1)
+
+
+class PhysicsScorer:
+    """
+    Scores genomes with batched ripple simulations (run_ripple_ensemble).
+    With workers > 1 the pending genomes are split into one ensemble per
+    worker of a process pool that stays open until close().
+    """
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.pool = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_physics_worker)
+
+    def __call__(self, genomes):
+        if self.pool is None or len(genomes) < 2:
+            metrics = run_ripple_ensemble(genomes)
+        else:
+            chunk = -(-len(genomes) // self.workers)
+            ensembles = [genomes[i:i + chunk] for i in range(0, len(genomes), chunk)]
+            metrics = [m for summaries in self.pool.map(run_ripple_ensemble, ensembles) for m in summaries]
+        return [physics_score(m) for m in metrics]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+def source_fingerprint(modules):
+    """sha1 over the source files of `modules`."""
+    digest = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def physics_objective(workers=WORKERS):
+    # Deterministic simulation: the code computing it is the cache fingerprint
+    fingerprint = f"ripple|{source_fingerprint(PHYSICS_MODULES)}"
+    scorer = PhysicsScorer(workers)
+    return Objective("physics", PHYSICS_SPACE, scorer, fingerprint, resource=scorer)
+
+
+OBJECTIVES = {"strategy": strategy_objective, "physics": physics_objective}
+
+
+# Explicit Parquet column types: nothing is guessed (a run_id like "20261017_195547"
+# must not become an integer, an all-None mean column must stay float)
+LOG_DTYPES = {
+    "run_id": str, "objective": str, "generation": "int64", "timestamp": str,
+    "best": "float64", "mean": "float64", "std": "float64", "failed": "int64",
+    "best_so_far": "float64", "evaluations": "int64", "cache_hit_rate": "float64", "seconds": "float64",
+}
+
+
+class GenerationLog:
+    """
+    Append-only JSONL of per-generation stats, one flushed line per generation.
+    The rows are also kept in memory (loaded once), so the Parquet export
+    never re-parses the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.rows = []
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.rows = [json.loads(line) for line in f if line.strip()]
+
+    def truncate(self, run_id, generation):
+        """Drops this run's rows from `generation` on (written after the checkpoint we resume from)."""
+        kept = [r for r in self.rows if r["run_id"] != run_id or r["generation"] < generation]
+        if len(kept) == len(self.rows):
+            return
+        self.rows = kept
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(json.dumps(r) + "\n" for r in kept)
+        os.replace(tmp_path, self.path)
+
+    def append(self, row):
+        self.rows.append(row)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(row) + "\n")
+
+    def to_parquet(self, path):
+        try:
+            import pandas as pd
+            df = pd.DataFrame(self.rows)
+            df = df.astype({k: v for k, v in LOG_DTYPES.items() if k in df.columns})
+            df.to_parquet(path, index=False)
+        except ImportError as e:
+            console.print(f"[yellow]⚠️ Parquet export skipped ({e})[/]")
+            return None
+        return path
+
+
+def generation_stats(scores):
+    finite = np.array([s for s in scores if s > PHYSICS_FAILED and np.isfinite(s)])
+    return {
+        "best": float(np.max(scores)),
+        "mean": float(finite.mean()) if len(finite) else None,
+        "std": float(finite.std()) if len(finite) else None,
+        "failed": len(scores) - len(finite),
     }
-    
-    # 2. Run Backtest
-    sharpe_ratio = engine.run_backtest(params)
-    
-    # 3. Return Fitness (The GA maximizes this)
-    return sharpe_ratio
-#!/usr/bin/env python3
-"""
-optimizer_agent.py
-Simple genetic optimizer for SRCL Elite.
-"""
-import random, json, os
-from rich.console import Console
 
-console = Console()
 
-def fitness(params):
-    # Placeholder fitness function
-    # Replace this with real call to srcl.run_simulation()
-    alpha, beta, gamma, D = params
-    return -((alpha - 0.5)**2 + (beta - 1)**2 + (gamma - 0.8)**2 + (D - 0.01)**2)
-
-def mutate(params):
-    return [p + random.uniform(-0.05, 0.05) for p in params]
-
-def crossover(p1, p2):
-    return [(a + b) / 2 for a, b in zip(p1, p2)]
-
-def run_optimizer(generations=20, pop_size=10):
-    population = [[random.random() for _ in range(4)] for _ in range(pop_size)]
-    for gen in range(generations):
-        population = sorted(population, key=fitness, reverse=True)
-        best = population[0]
-        console.print(f"[cyan]Gen {gen+1}[/]: Best fitness {fitness(best):.4f}")
-        new_pop = population[:2]
-        while len(new_pop) < pop_size:
-            p1, p2 = random.sample(population[:5], 2)
-            child = mutate(crossover(p1, p2))
-            new_pop.append(child)
-        population = new_pop
-    with open("analysis/best_params.json", "w") as f:
-        json.dump(best, f)
-    console.print(f"[green]✅ Optimization complete.[/] Best: {best}")
+def run_optimizer(objective, backend=BACKEND, generations=GENERATIONS, pop_size=POPULATION_SIZE,
+                  resume=False, seed=None, output_dir=OUTPUT_DIR):
+    """Optimizes `objective` (an Objective); returns (best genome, best score)."""
+    prefix = os.path.join(output_dir, f"agent_{objective.name}")
+    checkpoint_file = prefix + "_checkpoint.npz"
+    strategy = STRATEGIES[backend](objective.space, pop_size, seed=seed)
+    cache = FitnessCache(objective.fingerprint, path=prefix + "_cache.json")
+    log = GenerationLog(prefix + "_log.jsonl")
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    best_score, best_genome = -np.inf, None
+
+    start_gen = 1
+    if resume and os.path.exists(checkpoint_file):
+        state = load_checkpoint(checkpoint_file)
+        if state["backend"] == backend and state["pop_size"] == pop_size:
+            start_gen = state["generation"] + 1
+            run_id = state["run_id"]
+            best_score, best_genome = state["best_score"], state["best_genome"]
+            cache.misses = state["evaluations"]
+            strategy.set_state({k[len("strategy."):]: v for k, v in state.items() if k.startswith("strategy.")})
+            log.truncate(run_id, start_gen)
+            console.print(f"[yellow]♻️ Resuming {objective.name} run {run_id} from generation {start_gen}[/]")
+        else:
+            console.print("[yellow]⚠️ Checkpoint was written by another configuration, starting fresh[/]")
+
+    console.print(f"[bold]🧬 {objective.name.upper()} optimization ({backend}, {pop_size} x {generations})[/]")
+    for gen in range(start_gen, generations + 1):
+        started = time.perf_counter()
+        genomes = objective.space.decode(strategy.ask())
+        scores = cache.evaluate(genomes, objective.score)
+        strategy.tell(scores)
+
+        top = int(np.argmax(scores))
+        if scores[top] > best_score:
+            best_score, best_genome = float(scores[top]), genomes[top]
+        stats = generation_stats(scores)
+        log.append({
+            "run_id": run_id, "objective": objective.name, "generation": gen,
+            "timestamp": datetime.now().isoformat(), **stats,
+            "best_so_far": best_score, "evaluations": cache.misses,
+            "cache_hit_rate": cache.last_hit_rate, "seconds": time.perf_counter() - started,
+            "best_genome": best_genome,
+        })
+        console.print(f"[cyan]Gen {gen}[/]: Best fitness {stats['best']:.4f} | "
+                      f"Best so far {best_score:.4f} | Cache Hits: {cache.last_hit_rate:.0%}")
+
+        checkpoint = {
+            "generation": gen,
+            "run_id": run_id,
+            "backend": backend,
+            "pop_size": pop_size,
+            "best_score": best_score,
+            "best_genome": best_genome,
+            "evaluations": cache.misses,
+        }
+        checkpoint.update({f"strategy.{k}": v for k, v in strategy.get_state().items()})
+        cache.save()
+        save_checkpoint(checkpoint_file, checkpoint)
+
+    if PARQUET_LOG:
+        log.to_parquet(prefix + "_log.parquet")
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file) # Run finished; the next (watchdog) start is a fresh run
+    return best_genome, best_score
+
+
+def best_params_path(name):
+    """analysis/best_params.json for the default objective, as before; best_<name>_params.json for the others."""
+    return "analysis/best_params.json" if name == OBJECTIVE else f"analysis/best_{name}_params.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SRCL optimizer agent")
+    parser.add_argument("--objective", choices=sorted(OBJECTIVES), default=OBJECTIVE)
+    parser.add_argument("--backend", choices=sorted(STRATEGIES), default=BACKEND)
+    parser.add_argument("--generations", type=int, default=GENERATIONS)
+    parser.add_argument("--pop-size", type=int, default=POPULATION_SIZE)
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    args = parser.parse_args()
+
+    objective = OBJECTIVES[args.objective]()
+    try:
+        best, score = run_optimizer(objective, args.backend, args.generations, args.pop_size, resume=args.resume)
+    finally:
+        objective.close() # Worker pool (and shared memory) of the objective
 
-if __name__ == "__main__":
     os.makedirs("analysis", exist_ok=True)
-    run_optimizer()
+    with open(best_params_path(objective.name), "w") as f:
+        json.dump(best, f, indent=2)
+    console.print(f"[green]✅ Optimization complete.[/] Best ({score:.4f}): {best}")
+
+
+if __name__ == "__main__":
+    main()
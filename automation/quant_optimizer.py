@@ -10,13 +10,28 @@ import random
 import json
 import os
 import sys
+import numpy as np
+from functools import partial
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from srcl_core.backtest_engine import QuantEngine
+from srcl_core.backtest_engine import QuantEngine, ABORTED_SCORE
+from srcl_core.fitness_cache import FitnessCache
+from srcl_core.parallel_eval import ParallelEvaluator, backtest_objective, walk_forward_objective
+from srcl_core.search import STRATEGY_SPACE, BACKENDS, print_target_report
+from srcl_core.surrogate import Surrogate
+from srcl_core.checkpoint import save_checkpoint, load_checkpoint, get_random_state, set_random_state
 
 POPULATION_SIZE = 50
 GENERATIONS = 30
 TICKER = "BTC-USD"
+FITNESS_CACHE_FILE = "data/optimizer/hunter_fitness_cache.json" # Set to None to keep scores in memory only
+WORKERS = os.cpu_count() or 1 # >1 scores generations on a shared-memory process pool
+MAX_DRAWDOWN_FLOOR = None # e.g. -0.6 aborts genomes as soon as they draw down past 60%
+WALK_FORWARD_FOLDS = 0 # >0 ranks genomes by mean out-of-sample fitness over this many walk-forward folds
+BACKEND = "ga" # "ga" (truncation GA below), "de" or "cmaes" (array genomes, srcl_core.search)
+TARGET_FITNESS = None # Evaluations-to-target report level (None = this run's best)
+SURROGATE_KEEP = None # e.g. 0.5: only the best-predicted half of unseen genomes is backtested (helps ga/de, not cmaes)
+CHECKPOINT_FILE = "data/optimizer/hunter_checkpoint.npz" # Rewritten every generation; `--resume` continues from it
 
 print(f"🚀 Initializing HUNTER v2 (Positive Skew) for {TICKER}...")
 engine = QuantEngine(ticker=TICKER)
@@ -41,6 +56,8 @@ def generate_skewed_genome():
         'tp_multiplier': tp_mult
     }
 
+SEARCH_SPACE = STRATEGY_SPACE # Same ranges as generate_skewed_genome
+
 def mutate(genome):
     new_genome = genome.copy()
     if random.random() < 0.2:
@@ -61,38 +78,114 @@ def mutate(genome):
         
     return new_genome
 
-def run_pipeline():
+def surrogate_summary(surrogate):
+    rho = "n/a" if surrogate.last_rank_corr is None else f"{surrogate.last_rank_corr:+.2f}"
+    return f" | Screened: {surrogate.last_screened} | Surrogate ρ: {rho}"
+
+def run_pipeline(resume=False):
+    strategy = BACKENDS[BACKEND](SEARCH_SPACE, POPULATION_SIZE) if BACKEND != "ga" else None
     population = [generate_skewed_genome() for _ in range(POPULATION_SIZE)]
+    history = [] # (backtests run, best score) per generation
+    surrogate = Surrogate(SURROGATE_KEEP) if SURROGATE_KEEP else None
     best_overall = -9999.0
     best_genome = None
+    survivor_cutoff = None # Worst surviving score; hopeless genomes abort early
+    cache = FitnessCache(f"hunter-v2|dd={MAX_DRAWDOWN_FLOOR}|wf={WALK_FORWARD_FOLDS}|{engine.fingerprint()}",
+                         path=FITNESS_CACHE_FILE)
+    objective = backtest_objective
+    if WALK_FORWARD_FOLDS:
+        objective = partial(walk_forward_objective, n_folds=WALK_FORWARD_FOLDS)
+
+    start_gen = 1
+    if resume and os.path.exists(CHECKPOINT_FILE):
+        state = load_checkpoint(CHECKPOINT_FILE)
+        if state["backend"] == BACKEND:
+            start_gen = state["generation"] + 1
+            population = state["population"]
+            history = [tuple(h) for h in state["history"]]
+            best_overall, best_genome = state["best_score"], state["best_genome"]
+            survivor_cutoff = state["survivor_cutoff"]
+            cache.misses = state["evaluations"]
+            set_random_state(state["random_state"])
+            if strategy:
+                strategy.set_state({k[len("strategy."):]: v for k, v in state.items() if k.startswith("strategy.")})
+            if surrogate:
+                surrogate.set_state({k[len("surrogate."):]: v for k, v in state.items() if k.startswith("surrogate.")})
+            print(f"♻️ RESUMING from generation {start_gen}")
+        else:
+            print(f"⚠️ Checkpoint was written by the {state['backend']} backend, starting fresh")
 
-    print(f"\n🧬 HUNTING STARTED: Force Reward > 1.5x Risk")
+    print(f"\n🧬 HUNTING STARTED ({BACKEND.upper()}): Force Reward > 1.5x Risk")
     print("-" * 60)
 
-    for gen in range(1, GENERATIONS + 1):
-        scored_pop = []
-        for genome in population:
-            score = engine.run_backtest(genome)
-            scored_pop.append((genome, score))
+    evaluator = ParallelEvaluator([TICKER], objective=objective, workers=WORKERS) if WORKERS > 1 else None
+    score_fn = evaluator.map if evaluator else partial(objective, {TICKER: engine})
+    try:
+        for gen in range(start_gen, GENERATIONS + 1):
+            if strategy:
+                population = SEARCH_SPACE.decode(strategy.ask())
+                survivor_cutoff = strategy.cutoff
+            backtest = lambda genomes: score_fn(genomes, cutoff=survivor_cutoff, max_drawdown=MAX_DRAWDOWN_FLOOR)
+            if surrogate:
+                scores = surrogate.evaluate(population, cache, backtest)
+            else:
+                scores = cache.evaluate(population, backtest)
+            scored_pop = list(zip(population, scores))
         
-        scored_pop.sort(key=lambda x: x[1], reverse=True)
+            scored_pop.sort(key=lambda x: x[1], reverse=True)
         
-        if scored_pop[0][1] > best_overall:
-            best_overall = scored_pop[0][1]
-            best_genome = scored_pop[0][0]
+            if scored_pop[0][1] > best_overall:
+                best_overall = scored_pop[0][1]
+                best_genome = scored_pop[0][0]
             
-        valid_scores = [s[1] for s in scored_pop if s[1] > -900]
-        avg_score = sum(valid_scores)/len(valid_scores) if valid_scores else -999
+            valid_scores = [s[1] for s in scored_pop if s[1] > -900]
+            avg_score = sum(valid_scores)/len(valid_scores) if valid_scores else -999
         
-        print(f"Gen {gen:02d}: Best Score: {scored_pop[0][1]:.4f} | Avg: {avg_score:.4f}")
+            aborted = sum(1 for s in scored_pop if s[1] == ABORTED_SCORE)
         
-        survivors = [s[0] for s in scored_pop[:15]] 
-        next_gen = survivors[:]
-        while len(next_gen) < POPULATION_SIZE:
-            next_gen.append(mutate(survivors[random.randint(0, len(survivors)-1)]))
-        population = next_gen
+            line = f"Gen {gen:02d}: Best Score: {scored_pop[0][1]:.4f} | Avg: {avg_score:.4f} | Cache Hits: {cache.last_hit_rate:.0%} | Aborted: {aborted}"
+            if surrogate:
+                line += surrogate_summary(surrogate)
+            print(line)
+            history.append((cache.misses, best_overall))
+
+            if strategy:
+                strategy.tell(scores)
+            else:
+                survivors = [s[0] for s in scored_pop[:15]]
+                survivor_cutoff = scored_pop[14][1]
+                next_gen = survivors[:]
+                while len(next_gen) < POPULATION_SIZE:
+                    next_gen.append(mutate(survivors[random.randint(0, len(survivors)-1)]))
+                population = next_gen
+
+            checkpoint = {
+                "backend": BACKEND,
+                "generation": gen,
+                "population": population,
+                "scores": np.array(scores),
+                "history": history,
+                "best_score": best_overall,
+                "best_genome": best_genome,
+                "survivor_cutoff": survivor_cutoff,
+                "evaluations": cache.misses,
+                "random_state": get_random_state(),
+            }
+            if strategy:
+                checkpoint.update({f"strategy.{k}": v for k, v in strategy.get_state().items()})
+            if surrogate:
+                checkpoint.update({f"surrogate.{k}": v for k, v in surrogate.get_state().items()})
+            cache.save() # Resumed runs keep their cache hits
+            save_checkpoint(CHECKPOINT_FILE, checkpoint)
+    finally:
+        if evaluator:
+            evaluator.close()
 
     print("-" * 60)
+    print_target_report({BACKEND: history}, TARGET_FITNESS)
+    cache.save()
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE) # Finished; the next run starts fresh
     print("💾 SAVING WINNER...")
     engine.save_params(best_genome)
     
@@ -107,7 +200,9 @@ def run_pipeline():
     print(f"🔄 Total Trades:     {stats['Trades']}")
     print(f"🔢 Sharpe Ratio:     {stats['Sharpe']:.4f}")
     print(f"⚖️ Risk Ratio:       1 : {best_genome['tp_multiplier']/best_genome['sl_multiplier']:.2f}")
+    folds = engine.walk_forward(best_genome)
+    print(f"🧪 Walk-Forward:     {' | '.join(f'{s:.2f}' for s in folds['test'])}")
     print("=" * 40)
 
 if __name__ == "__main__":
-    run_pipeline()
+    run_pipeline(resume="--resume" in sys.argv)
@@ -7,11 +7,10 @@ Hardcoded with your latest AI results.
 import sys
 import os
 import pandas as pd
-import numpy as np
 
 # Ensure we can import from core
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from srcl_core.backtest_engine import QuantEngine
+from srcl_core.backtest_engine import QuantEngine, EXIT_REASONS
 
 # 🏆 YOUR LATEST "LAZY SNIPER" PARAMETERS
 WINNING_PARAMS = {
@@ -28,104 +27,21 @@ WINNING_PARAMS = {
 def print_audit_report(params):
     print("🚀 Initializing Dynamic Audit Engine...")
     engine = QuantEngine(ticker="BTC-USD")
-    df = engine.data.copy()
-    
-    # --- REPLICATE LOGIC FROM BACKTEST ENGINE ---
-    w_trend = params.get('w_trend', 0.5)
-    w_mean_rev = params.get('w_mean_rev', 0.5)
-    w_vol = params.get('w_vol', 0.5)
-    rsi_period = int(params.get('rsi_period', 14))
-    buy_thresh = params.get('buy_thresh', 0.2)
-    sell_thresh = params.get('sell_thresh', 0.2)
-    sl_multiplier = params.get('sl_multiplier', 2.0)
-    tp_multiplier = params.get('tp_multiplier', 3.0)
 
-    # Generate Signals
-    sma_fast = df['Close'].rolling(window=20).mean()
-    sma_slow = df['Close'].rolling(window=50).mean()
-    trend_signal = np.where(sma_fast > sma_slow, 1.0, -1.0)
-
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    rsi_signal = (50 - rsi) / 50 
-
-    vol_signal = np.where(df['Volatility_20d'] > 0.03, -1.0, 1.0)
-    raw_score = (w_trend * trend_signal) + (w_mean_rev * rsi_signal) + (w_vol * vol_signal)
-
-    # Execution Loop
-    prices = df['Close'].values
-    atrs = df['ATR_Proxy'].values
-    signals = raw_score.values
-    dates = df.index
-    
-    balance = 1000.0
-    position = 0
-    entry_price = 0.0
-    stop_price = 0.0
-    target_price = 0.0
-    
-    trades = []
-    equity_curve = []
-    
-    for i in range(len(prices)):
-        price = prices[i]
-        signal = signals[i]
-        date = dates[i]
-        current_atr = atrs[i]
-        
-        current_val = balance
-        
-        if position == 1:
-            # Check Exits
-            pnl = (price - entry_price) / entry_price
-            
-            # Stop Loss (Dynamic)
-            if price < stop_price:
-                balance = balance * (stop_price / entry_price) # Exit exactly at stop
-                position = 0
-                trades.append({'date': date, 'type': 'STOP_LOSS', 'pnl': (stop_price - entry_price)/entry_price})
-            # Take Profit (Dynamic)
-            elif price > target_price:
-                balance = balance * (target_price / entry_price) # Exit exactly at target
-                position = 0
-                trades.append({'date': date, 'type': 'TAKE_PROFIT', 'pnl': (target_price - entry_price)/entry_price})
-            # Signal Exit
-            elif signal < -sell_thresh:
-                balance = balance * (1 + pnl)
-                position = 0
-                trades.append({'date': date, 'type': 'SIGNAL_EXIT', 'pnl': pnl})
-            else:
-                current_val = balance * (1 + pnl)
-                
-        elif position == 0:
-            if signal > buy_thresh:
-                position = 1
-                entry_price = price
-                # Set Barriers at Entry
-                stop_dist = current_atr * sl_multiplier
-                target_dist = current_atr * tp_multiplier
-                stop_price = entry_price - stop_dist
-                target_price = entry_price + target_dist
-                
-                trades.append({'date': date, 'type': 'ENTRY', 'pnl': 0})
-        
-        equity_curve.append(current_val)
+    # Same kernel as the optimizer; the ledger lists every closed trade
+    _, ledger = engine.run_backtest(params, ledger=True)
+    equity_series = pd.Series(ledger['equity'], index=engine.data.index)
+    pnl = ledger['pnl']
 
     # --- REPORTING ---
-    equity_series = pd.Series(equity_curve)
     total_return = (equity_series.iloc[-1] - 1000.0) / 1000.0 * 100
-    
+
     peak = equity_series.cummax()
     drawdown = (equity_series - peak) / peak
     max_drawdown = drawdown.min() * 100
-    
+
     # Win Rate
-    completed_trades = [t for t in trades if t['type'] != 'ENTRY']
-    winning_trades = [t for t in completed_trades if t['pnl'] > 0]
-    win_rate = (len(winning_trades) / len(completed_trades)) * 100 if len(completed_trades) > 0 else 0
+    win_rate = (pnl > 0).mean() * 100 if len(pnl) > 0 else 0
 
     print("\n📊 SRCL DYNAMIC STRATEGY AUDIT")
     print("=" * 40)
@@ -134,7 +50,18 @@ def print_audit_report(params):
     print(f"📈 Total Return:     {total_return:.2f}%")
     print(f"📉 Max Drawdown:     {max_drawdown:.2f}%")
     print(f"🎯 Win Rate:         {win_rate:.2f}%")
-    print(f"🔄 Total Trades:     {len(completed_trades)}")
+    print(f"🔄 Total Trades:     {len(pnl)}")
+    print("=" * 40)
+    print("Exits by Type:")
+    for reason, name in EXIT_REASONS.items():
+        hits = ledger['reason'] == reason
+        if hits.any():
+            print(f"{name:<12} {hits.sum():>4} trades | avg {pnl[hits].mean() * 100:+.2f}%")
+    if len(pnl) > 0:
+        last = len(pnl) - 1
+        dates = engine.data.index
+        print(f"Last Trade: {dates[ledger['entry'][last]].date()} -> {dates[ledger['exit'][last]].date()} "
+              f"({EXIT_REASONS[ledger['reason'][last]]}, {pnl[last] * 100:+.2f}%)")
     print("=" * 40)
     print("Parameters Used:")
     print(f"RSI Period: {params['rsi_period']}")
@@ -9,19 +9,22 @@ from datetime import datetime
 
 logging.basicConfig(filename="logs/watchdog.log", level=logging.INFO)
 
+# Script plus arguments. The genetic optimizers take "--resume" to continue
+# from their last per-generation checkpoint instead of starting over, e.g.
+#   "hydra": ["automation/hydra_optimizer.py", "--resume"]
 TARGETS = {
-    "adaptive_montecarlo": "automation/adaptive_montecarlo.py",
-    "optimizer": "automation/optimizer_agent.py"
+    "adaptive_montecarlo": ["automation/adaptive_montecarlo.py"],
+    "optimizer": ["automation/optimizer_agent.py", "--resume"]
 }
 
 def restart_process(name, cmd):
     logging.warning(f"[{datetime.now()}] Restarting {name}")
-    subprocess.Popen(["python3", cmd])
+    subprocess.Popen(["python3", *cmd])
 
 def watchdog_loop():
     while True:
         for name, cmd in TARGETS.items():
-            if not any(cmd in p.cmdline() for p in psutil.process_iter()):
+            if not any(cmd[0] in p.cmdline() for p in psutil.process_iter()):
                 restart_process(name, cmd)
         time.sleep(60)
 
@@ -5,78 +5,114 @@ SRCL Monte Carlo Engine v3
 Massively parallel parameter-space exploration for the SRCL
 Environmental Ripple simulation.
 Generates large-scale datasets of coherence, entropy, and pattern stability.
+Samples run in-process in the worker pool, ENSEMBLE_SIZE at a time as one
+batched simulation (run_ripple_ensemble), not as one Python interpreter per
+sample. Workers return metrics directly; the main process streams them into
+append-only Parquet datasets under OUTPUT_DIR/store (summary/: one row per
+sample, traces/: per-step metrics, only with STORE_TRACES), and the CSV and
+plots are built from the store.
 ------------------------------------------------------------
 """
 
-import os, json, random, subprocess, multiprocessing as mp
-import numpy as np, pandas as pd
+import os, sys, random, multiprocessing as mp
+import pandas as pd
 import matplotlib.pyplot as plt
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 from tqdm import tqdm
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from srcl_core.srcl_environmental_ripple import PARAM_RANGES, run_ripple_ensemble
+from srcl_core.metrics_sink import MetricsSink
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
 
 MONTE_CARLO_RUNS = 500  # 🔧 Start small (500) → Scale to 10_000 when stable
 STEPS = 500             # Fewer steps for parallel efficiency
+SIZE = 200              # Ripple grid size
+METRICS_EVERY = 1       # Average metrics over every Nth step (+ the last); >1 skips metric work in between
+ENSEMBLE_SIZE = 8       # Samples advanced together per worker task
 OUTPUT_DIR = Path("results_montecarlo_v3")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+STORE_DIR = OUTPUT_DIR / "store"  # Parquet datasets; every run appends its own part files
+STORE_TRACES = False    # Also store each sample's per-step coherence/entropy trace
+ROW_GROUP_ROWS = 1000   # Summary rows per Parquet part (one row group each)
+TRACE_ROW_GROUP_ROWS = 64  # Trace rows (samples) per part
+STORE_FLUSH_SECONDS = 60.0  # Write a (smaller) part at least this often
 
-RANGES = {
-    "alpha": (0.05, 0.12),
-    "beta":  (0.08, 0.12),
-    "gamma": (0.3, 0.9),
-    "D":     (0.6, 1.0),
-}
+RANGES = PARAM_RANGES
 
 # ============================================================
-# SINGLE SIMULATION WORKER
+# ENSEMBLE WORKER
 # ============================================================
 
-def run_single_sim(idx):
-    """Run one SRCL simulation and return its averaged metrics."""
-    params = {k: random.uniform(*v) for k, v in RANGES.items()}
-    log_path = OUTPUT_DIR / f"log_{idx:05d}.jsonl"
-
-    cmd = [
-        "python", "srcl_core/srcl_environmental_ripple.py",
-        "--alpha", str(params["alpha"]),
-        "--beta", str(params["beta"]),
-        "--gamma", str(params["gamma"]),
-        "--D", str(params["D"]),
-        "--log", str(log_path),
-    ]
+def init_worker():
+    # Parallelism comes from the pool; keep each worker's kernels single-threaded
+    import numba
+    numba.set_num_threads(1)
+
+def run_ensemble_sims(idx, run_id):
+    """
+    Run ensemble `idx` (up to ENSEMBLE_SIZE samples). Returns their summary
+    rows (parameters + averaged metrics) and, with STORE_TRACES, their trace
+    rows (per-step metrics as list columns).
+    """
+    first = idx * ENSEMBLE_SIZE
+    n = min(ENSEMBLE_SIZE, MONTE_CARLO_RUNS - first)
+    param_table = [{k: random.uniform(*v) for k, v in RANGES.items()} for _ in range(n)]
 
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-    # Parse the output
     try:
-        with open(log_path, "r") as f:
-            data = [json.loads(line) for line in f if line.strip()]
-        if not data:
-            return None
-        avg_coh = np.mean([d["coherence_A"] for d in data if "coherence_A" in d])
-        avg_ent = np.mean([d["entropy_A"] for d in data if "entropy_A" in d])
-        result = {**params, "coherence": avg_coh, "entropy": avg_ent}
-        return result
+        summaries, trace = run_ripple_ensemble(param_table, STEPS, SIZE, every=METRICS_EVERY, traces=True)
     except Exception as e:
-        print(f"[{idx}] ⚠️ Error reading log: {e}")
-        return None
+        print(f"[{idx}] ⚠️ Ensemble failed: {e}")
+        return [], []
+
+    rows, trace_rows = [], []
+    for i, (params, summary) in enumerate(zip(param_table, summaries)):
+        if summary is None:
+            continue
+        sample = {"run_id": run_id, "sample": first + i}
+        rows.append({**sample, **params, **summary, "steps": STEPS, "size": SIZE, "metrics_every": METRICS_EVERY})
+        if STORE_TRACES:
+            trace_rows.append({
+                **sample,
+                "step": trace["step"].tolist(),
+                "coherence_A": trace["coherence_A"][i].tolist(),
+                "entropy_A": trace["entropy_A"][i].tolist(),
+            })
+    return rows, trace_rows
 
 # ============================================================
 # PARALLEL EXECUTION
 # ============================================================
 
 def run_montecarlo():
-    print(f"🎲 Running Monte Carlo with {MONTE_CARLO_RUNS} samples...")
-    with mp.Pool(processes=max(2, mp.cpu_count() - 1)) as pool:
-        results = list(tqdm(pool.imap(run_single_sim, range(MONTE_CARLO_RUNS)), total=MONTE_CARLO_RUNS))
-
-    results = [r for r in results if r is not None]
-    df = pd.DataFrame(results)
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    print(f"🎲 Running Monte Carlo with {MONTE_CARLO_RUNS} samples (run {run_id})...")
+    n_ensembles = -(-MONTE_CARLO_RUNS // ENSEMBLE_SIZE)
+    summary_sink = MetricsSink(STORE_DIR / "summary", "dataset",
+                               batch_size=ROW_GROUP_ROWS, flush_seconds=STORE_FLUSH_SECONDS)
+    trace_sink = MetricsSink(STORE_DIR / "traces" if STORE_TRACES else None, "dataset",
+                             batch_size=TRACE_ROW_GROUP_ROWS, flush_seconds=STORE_FLUSH_SECONDS)
+    worker = partial(run_ensemble_sims, run_id=run_id)
+    with mp.Pool(processes=max(2, mp.cpu_count() - 1), initializer=init_worker) as pool, summary_sink, trace_sink:
+        for rows, trace_rows in tqdm(pool.imap(worker, range(n_ensembles)), total=n_ensembles):
+            for row in rows:
+                summary_sink.write(row)
+            for row in trace_rows:
+                trace_sink.write(row)
+
+    if summary_sink.rows_written == 0:
+        print("\n❌ No simulation produced metrics.")
+        return
+
+    # This run's rows, read back from the store
+    df = pd.read_parquet(STORE_DIR / "summary", filters=[("run_id", "==", run_id)]).sort_values("sample")
     csv_path = OUTPUT_DIR / "srcl_montecarlo_results.csv"
-    df.to_csv(csv_path, index=False)
+    df[[*RANGES, "coherence", "entropy"]].to_csv(csv_path, index=False)
     print(f"\n✅ Monte Carlo complete. Saved → {csv_path}")
 
     # ========================================================
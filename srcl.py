@@ -4,16 +4,20 @@ matplotlib.use("Agg")  # headless mode (no display)
 import matplotlib.pyplot as plt
 from scipy.ndimage import laplace
 from pathlib import Path
+from srcl_core.spectral import SpectralIntegrator
 
 def run_srcl_memory(
     grid=120, steps=500,
     D=0.2, alpha=0.3, beta=1.0, gamma=0.4, k=0.7,
-    dt=0.02, noise=0.05, memory_decay=0.97, memory_gain=0.05
+    dt=0.02, noise=0.05, memory_decay=0.97, memory_gain=0.05,
+    method="euler", plot_every=100
 ):
     """
     SRCL-M: Self-Referential Continuity Lattice with Memory Feedback.
     Each cell remembers a weighted average of its past gradients (M),
     influencing its reflexivity (R). This allows emergent rhythmic structures.
+    method="spectral" integrates D∇²C - αC exactly (srcl_core.spectral).
+    Returns the final (C, R, M).
     """
 
     results_dir = Path("~/origin/continuity_lab/results_srclm").expanduser()
@@ -25,9 +29,9 @@ def run_srcl_memory(
     M = np.zeros_like(C)  # memory field
 
     print(f"🧠 Starting SRCL-M simulation: grid={grid}, steps={steps}")
+    spectral = SpectralIntegrator(C.shape, dt, D, -alpha) if method == "spectral" else None
 
     for t in range(steps):
-        lapC = laplace(C, mode="wrap")
         lapR = laplace(R, mode="wrap")
         gradCx, gradCy = np.gradient(C)
         grad_mag = np.sqrt(gradCx**2 + gradCy**2)
@@ -39,13 +43,17 @@ def run_srcl_memory(
         dR = k * (np.tanh(M + np.abs(gradCx) + np.abs(gradCy)) - R)
 
         # Main field update (C coupled to R and memory)
-        dC = D * lapC - alpha * C + beta * C**3 + gamma * R * lapR - 0.2 * M * C
-
-        # Integrate
-        C += dt * dC + noise * np.random.randn(*C.shape) * dt
+        if spectral:
+            C = spectral.step(C, beta * C**3 + gamma * R * lapR - 0.2 * M * C + noise * np.random.randn(*C.shape))
+        else:
+            lapC = laplace(C, mode="wrap")
+            dC = D * lapC - alpha * C + beta * C**3 + gamma * R * lapR - 0.2 * M * C
+
+            # Integrate
+            C += dt * dC + noise * np.random.randn(*C.shape) * dt
         R += dt * dR
 
-        if t % 100 == 0:
+        if plot_every and t % plot_every == 0:
             print(f"🌀 Step {t}/{steps}")
 
             fig, ax = plt.subplots(1, 3, figsize=(10, 4))
@@ -68,6 +76,7 @@ def run_srcl_memory(
             plt.close(fig)
 
     print("✅ SRCL-M complete! Check ~/origin/continuity_lab/results_srclm for output images.")
+    return C, R, M
 
 if __name__ == "__main__":
     run_srcl_memory()
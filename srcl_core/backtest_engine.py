@@ -9,27 +9,423 @@ SRCL ELITE - QUANT ENGINE (Phase 6: REGIME AWARE)
 import pandas as pd
 import numpy as np
 import os
+import glob
 import json
+from collections import OrderedDict
+
+try:
+    from numba import njit, prange
+    from numba.extending import register_jitable
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 DATA_DIR = "data/market_data"
 PARAM_FILE = "automation/best_hunter_params.json"
 
+MIN_TRADES = 40
+DEAD_SCORE = -999.0
+ABORTED_SCORE = -1000.0 # Early-abort sentinel: provably hopeless, ranks below every evaluated genome
+INDICATOR_CACHE_SIZE = 64
+
+VOL_CEILING = 0.04 # Volatility_20d above this votes against entries
+BEAR_MIN_SIGNAL = 0.3 # Minimum signal to enter while Close < SMA_200
+
+# Execution events reported by _bar_step
+EVENT_NONE = 0
+EVENT_ENTRY = 1
+EVENT_STOP = 2
+EVENT_TARGET = 3
+EVENT_SIGNAL_EXIT = 4
+EXIT_REASONS = {EVENT_STOP: "STOP_LOSS", EVENT_TARGET: "TAKE_PROFIT", EVENT_SIGNAL_EXIT: "SIGNAL_EXIT"}
+
+# Columns the execution kernel reads (see QuantEngine.market_arrays)
+MARKET_COLUMNS = ('Close', 'SMA_200', 'ATR_Proxy', 'Volatility_20d')
+# Per-asset statistics returned by MultiAssetEngine
+STAT_COLUMNS = ('Sharpe', 'Total Return %', 'Max Drawdown %', 'Trades')
+
+
+def _bar_step(price, sma, atr, signal, buy_thresh, sell_thresh, sl_mult, tp_mult,
+              balance, position, entry_price, stop_price, target_price):
+    """
+    One bar of regime-aware execution, shared by the backtest kernel and the
+    live StreamState. Takes the position state before the bar and returns
+    (balance, position, entry_price, stop_price, target_price, event, equity)
+    after it; `event` is one of the EVENT_* codes.
+    """
+    # Skip if SMA not calculated yet (first 200 days)
+    if np.isnan(sma):
+        return balance, position, entry_price, stop_price, target_price, EVENT_NONE, balance
+
+    # DETERMINE REGIME
+    is_bull_market = price > sma
+    event = EVENT_NONE
+
+    if position == 1:
+        if price < stop_price:
+            balance *= (stop_price / entry_price)
+            position = 0
+            event = EVENT_STOP
+        elif price > target_price:
+            balance *= (target_price / entry_price)
+            position = 0
+            event = EVENT_TARGET
+        elif signal < -sell_thresh:
+            pnl = (price - entry_price) / entry_price
+            balance *= (1 + pnl)
+            position = 0
+            event = EVENT_SIGNAL_EXIT
+
+    elif position == 0:
+        if signal > buy_thresh:
+            # 🛑 THE REGIME FILTER 🛑
+            # If we are in a Bear Market (Price < SMA), we IGNORE Trend Signals.
+            # We only buy if the Mean Reversion signal (RSI) is screaming "Cheap!"
+            allow_trade = True
+            if not is_bull_market:
+                # In Bear Market, enforce stricter rules
+                if signal < BEAR_MIN_SIGNAL: # Hardcoded safety filter
+                    allow_trade = False
+
+            if allow_trade:
+                position = 1
+                entry_price = price
+                stop_price = entry_price - (atr * sl_mult)
+                target_price = entry_price + (atr * tp_mult)
+                event = EVENT_ENTRY
+
+    if position == 1:
+        equity = balance * (price / entry_price)
+    else:
+        equity = balance
+    return balance, position, entry_price, stop_price, target_price, event, equity
+
+
+if NUMBA_AVAILABLE:
+    # Stays a plain Python function; compiled kernels inline it
+    _bar_step = register_jitable(inline='always')(_bar_step)
+
+
+def _execute_into(prices, smas, atrs, signals, buy_thresh, sell_thresh, sl_mult, tp_mult, equity, trades,
+                  min_trades=0, dd_floor=-np.inf, ledger=None):
+    """
+    Regime-aware execution over one price series.
+    Fills `equity` (one value per bar) and `trades` (+1 win / -1 loss, in the
+    order they closed). Returns (n_trades, aborted_at). With numba installed
+    it is also compiled (`_execute_into_jit`, QuantEngine(compiled=True)) and
+    both paths give bit-for-bit the same equity curve and trades.
+
+    `ledger` (optional int64 array, 3 x max trades) receives the entry bar,
+    exit bar and EVENT_* exit reason of each closed trade. When it is None the
+    compiled kernel drops the bookkeeping entirely.
+
+    Early abort: the loop stops (rest of `equity` = NaN, aborted_at = bar)
+    once `min_trades` closed trades are provably out of reach, or the running
+    drawdown falls below `dd_floor`. With the defaults it never aborts and
+    aborted_at is -1.
+    """
+    n_bars = len(prices)
+    n_trades = 0
+
+    balance = 1000.0
+    position = 0
+    entry_price = 0.0
+    stop_price = 0.0
+    target_price = 0.0
+    peak = 0.0
+    entry_bar = 0
+
+    for i in range(n_bars):
+        if np.isnan(smas[i]):
+            equity[i] = balance
+            continue
+
+        balance, position, entry_price, stop_price, target_price, event, equity[i] = _bar_step(
+            prices[i], smas[i], atrs[i], signals[i], buy_thresh, sell_thresh, sl_mult, tp_mult,
+            balance, position, entry_price, stop_price, target_price
+        )
+        if event == EVENT_STOP:
+            trades[n_trades] = -1
+            n_trades += 1
+        elif event == EVENT_TARGET:
+            trades[n_trades] = 1
+            n_trades += 1
+        elif event == EVENT_SIGNAL_EXIT:
+            trades[n_trades] = 1 if prices[i] > entry_price else -1
+            n_trades += 1
+
+        if ledger is not None:
+            if event == EVENT_ENTRY:
+                entry_bar = i
+            elif event != EVENT_NONE:
+                ledger[0, n_trades - 1] = entry_bar
+                ledger[1, n_trades - 1] = i
+                ledger[2, n_trades - 1] = event
+
+        # --- EARLY ABORT ---
+        # Every further trade needs an entry bar and a later exit bar
+        # (an open position only needs its exit bar).
+        remaining = n_bars - 1 - i
+        hopeless = n_trades + (remaining + position) // 2 < min_trades
+        if equity[i] > peak:
+            peak = equity[i]
+        if hopeless or (equity[i] - peak) / peak < dd_floor:
+            equity[i + 1:] = np.nan
+            return n_trades, i
+
+    return n_trades, -1
+
+
+def _execute_batch(prices, smas, atrs, signals, buy_thresh, sell_thresh, sl_mult, tp_mult, equity, trades,
+                   min_trades, dd_floor):
+    """Runs `_execute_into` for every row of a (genomes x bars) signal matrix."""
+    counts = np.empty(signals.shape[0], dtype=np.int64)
+    aborted = np.empty(signals.shape[0], dtype=np.int64)
+    for g in range(signals.shape[0]):
+        counts[g], aborted[g] = _execute_into(prices, smas, atrs, signals[g], buy_thresh[g], sell_thresh[g],
+                                              sl_mult[g], tp_mult[g], equity[g], trades[g],
+                                              min_trades, dd_floor)
+    return counts, aborted
+
+
+def _execute_grid(prices, smas, atrs, signals, lengths, buy_thresh, sell_thresh, sl_mult, tp_mult, equity, trades,
+                  min_trades, dd_floor):
+    """
+    Runs `_execute_into` for every (genome, asset) cell of a
+    (genomes x assets x bars) signal tensor. Asset rows are left-aligned and
+    asset `a` uses its first `lengths[a]` bars.
+    """
+    n_genomes, n_assets = signals.shape[0], signals.shape[1]
+    counts = np.empty((n_genomes, n_assets), dtype=np.int64)
+    aborted = np.empty((n_genomes, n_assets), dtype=np.int64)
+    for cell in range(n_genomes * n_assets):
+        g, a = cell // n_assets, cell % n_assets
+        n = lengths[a]
+        counts[g, a], aborted[g, a] = _execute_into(prices[a, :n], smas[a, :n], atrs[a, :n], signals[g, a, :n],
+                                                    buy_thresh[g], sell_thresh[g], sl_mult[g], tp_mult[g],
+                                                    equity[g, a, :n], trades[g, a], min_trades, dd_floor)
+    return counts, aborted
+
+
+def _execute_windows(prices, smas, atrs, signals, starts, stops, buy_thresh, sell_thresh, sl_mult, tp_mult,
+                     equity, trades):
+    """
+    Runs `_execute_into` on each [starts[w], stops[w]) window of one series.
+    Every window starts flat with a fresh balance; row w of `equity` holds the
+    window's curve left-aligned.
+    """
+    counts = np.empty(len(starts), dtype=np.int64)
+    for w in range(len(starts)):
+        a, b = starts[w], stops[w]
+        counts[w], _ = _execute_into(prices[a:b], smas[a:b], atrs[a:b], signals[a:b],
+                                     buy_thresh, sell_thresh, sl_mult, tp_mult,
+                                     equity[w, :b - a], trades[w], 0, -np.inf)
+    return counts
+
+
+if NUMBA_AVAILABLE:
+    _execute_into_jit = njit(cache=True)(_execute_into)
+
+    @njit(parallel=True, cache=True)
+    def _execute_batch_jit(prices, smas, atrs, signals, buy_thresh, sell_thresh, sl_mult, tp_mult, equity, trades,
+                           min_trades, dd_floor):
+        counts = np.empty(signals.shape[0], dtype=np.int64)
+        aborted = np.empty(signals.shape[0], dtype=np.int64)
+        for g in prange(signals.shape[0]):
+            counts[g], aborted[g] = _execute_into_jit(prices, smas, atrs, signals[g], buy_thresh[g], sell_thresh[g],
+                                                      sl_mult[g], tp_mult[g], equity[g], trades[g],
+                                                      min_trades, dd_floor)
+        return counts, aborted
+
+    @njit(parallel=True, cache=True)
+    def _execute_grid_jit(prices, smas, atrs, signals, lengths, buy_thresh, sell_thresh, sl_mult, tp_mult, equity, trades,
+                          min_trades, dd_floor):
+        n_genomes, n_assets = signals.shape[0], signals.shape[1]
+        counts = np.empty((n_genomes, n_assets), dtype=np.int64)
+        aborted = np.empty((n_genomes, n_assets), dtype=np.int64)
+        for cell in prange(n_genomes * n_assets):
+            g, a = cell // n_assets, cell % n_assets
+            n = lengths[a]
+            counts[g, a], aborted[g, a] = _execute_into_jit(prices[a, :n], smas[a, :n], atrs[a, :n], signals[g, a, :n],
+                                                            buy_thresh[g], sell_thresh[g], sl_mult[g], tp_mult[g],
+                                                            equity[g, a, :n], trades[g, a], min_trades, dd_floor)
+        return counts, aborted
+
+    @njit(parallel=True, cache=True)
+    def _execute_windows_jit(prices, smas, atrs, signals, starts, stops, buy_thresh, sell_thresh, sl_mult, tp_mult,
+                             equity, trades):
+        counts = np.empty(len(starts), dtype=np.int64)
+        for w in prange(len(starts)):
+            a, b = starts[w], stops[w]
+            counts[w], _ = _execute_into_jit(prices[a:b], smas[a:b], atrs[a:b], signals[a:b],
+                                             buy_thresh, sell_thresh, sl_mult, tp_mult,
+                                             equity[w, :b - a], trades[w], 0, -np.inf)
+        return counts
+else:
+    _execute_into_jit = None
+    _execute_batch_jit = None
+    _execute_grid_jit = None
+    _execute_windows_jit = None
+
+
+def fold_windows(n_bars, start=0, mode="walk_forward", n_folds=5, train_bars=None, test_bars=None):
+    """
+    Splits bars [start, n_bars) into folds. Returns a list of
+    (train_start, train_stop, test_start, test_stop) tuples.
+
+    walk_forward: rolling windows, train followed by test, stepping by
+        test_bars. Defaults size the windows so exactly n_folds fit, with
+        train twice as long as test.
+    kfold: n_folds contiguous test blocks. The train set (every other block)
+        is not one contiguous series, so train_start/train_stop are None.
+    """
+    usable = n_bars - start
+    if mode == "walk_forward":
+        if test_bars is None:
+            test_bars = usable // (n_folds + 2)
+        if train_bars is None:
+            train_bars = 2 * test_bars
+        folds = []
+        train_start = start
+        while train_start + train_bars + test_bars <= n_bars and len(folds) < n_folds:
+            test_start = train_start + train_bars
+            folds.append((train_start, test_start, test_start, test_start + test_bars))
+            train_start += test_bars
+        return folds
+    if mode == "kfold":
+        edges = np.linspace(start, n_bars, n_folds + 1).astype(int)
+        return [(None, None, int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+    raise ValueError(f"Unknown fold mode: {mode}")
+
+
+
+
+def _abort_limits(cutoff, max_drawdown):
+    """
+    Translates the caller's early-abort request into provable kernel bounds.
+    A genome that cannot reach MIN_TRADES can only score DEAD_SCORE, so the
+    trade bound is active whenever `cutoff` (the score to beat) exceeds it.
+    `max_drawdown` is a floor as a fraction, e.g. -0.5.
+    """
+    min_trades = MIN_TRADES if cutoff is not None and cutoff > DEAD_SCORE else 0
+    dd_floor = float(max_drawdown) if max_drawdown is not None else -np.inf
+    return min_trades, dd_floor
+
+
+def _score_equity(equity, trade_counts, aborted=None, min_trades=MIN_TRADES):
+    """
+    Vectorized scoring of a (rows x bars) equity matrix.
+    Matches the pandas pct_change/cummax formulation value for value.
+    Rows flagged in `aborted` (>= 0) score ABORTED_SCORE; rows with fewer
+    than `min_trades` (scalar or per row) trades score DEAD_SCORE.
+    """
+    final_balance = equity[:, -1]
+    total_return = (final_balance - 1000.0) / 1000.0
+    peak = np.maximum.accumulate(equity, axis=1)
+    max_drawdown = ((equity - peak) / peak).min(axis=1)
+
+    returns = equity[:, 1:] / equity[:, :-1] - 1
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std == 0, -1.0, (mean * 252) / (std * np.sqrt(252)))
+
+    # Reward Safety more now
+    fitness = sharpe + (total_return * 1.5) + (max_drawdown * 8.0) # Heavier penalty for DD
+    min_trades = np.broadcast_to(min_trades, trade_counts.shape)
+    fitness = np.where(trade_counts < min_trades, DEAD_SCORE, fitness)
+    if aborted is None:
+        aborted = np.full(len(trade_counts), -1)
+    fitness = np.where(aborted >= 0, ABORTED_SCORE, fitness)
+
+    return {
+        "fitness": fitness,
+        "final_balance": final_balance,
+        "total_return": total_return,
+        "max_drawdown": max_drawdown,
+        "sharpe": sharpe,
+        "trades": trade_counts,
+        "aborted": aborted,
+        "min_trades": min_trades,
+    }
+
+
+def _report(scores, row):
+    """Builds the `detailed_report` dict for one row of `_score_equity` output."""
+    if scores["aborted"][row] >= 0:
+        return ABORTED_SCORE
+    if scores["trades"][row] < scores["min_trades"][row]:
+        return DEAD_SCORE
+    return {
+        "Final Balance": float(scores["final_balance"][row]),
+        "Total Return %": float(scores["total_return"][row] * 100),
+        "Max Drawdown %": float(scores["max_drawdown"][row] * 100),
+        "Trades": int(scores["trades"][row]),
+        "Sharpe": float(scores["sharpe"][row])
+    }
+
+
+def _genes(params):
+    """Reads the strategy genes from a genome dict, applying the engine defaults."""
+    return {
+        'w_trend': params.get('w_trend', 0.5),
+        'w_mean_rev': params.get('w_mean_rev', 0.5),
+        'w_vol': params.get('w_vol', 0.5),
+        'rsi_period': int(params.get('rsi_period', 14)),
+        'buy_thresh': params.get('buy_thresh', 0.2),
+        'sell_thresh': params.get('sell_thresh', 0.2),
+        'sl_mult': params.get('sl_multiplier', 2.0),
+        'tp_mult': params.get('tp_multiplier', 3.0),
+    }
+
+
 class QuantEngine:
-    def __init__(self, ticker="BTC-USD"):
+    def __init__(self, ticker="BTC-USD", compiled=True, cache_size=INDICATOR_CACHE_SIZE, data=None, arrays=None):
         self.ticker = ticker
-        self.data = self._load_data()
+        # Fall back to the Python loop when numba is not installed
+        self.compiled = compiled and NUMBA_AVAILABLE
+        self.data = data if data is not None else self._load_data()
+
+        # Market columns as contiguous float64 arrays (read once, never copied)
+        if arrays is None:
+            arrays = {c: self._column(c) for c in MARKET_COLUMNS}
+        self._prices, self._smas, self._atrs, self._vols = (arrays[c] for c in MARKET_COLUMNS)
+
+        # (indicator, window) -> array, least recently used first
+        self._indicators = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @classmethod
+    def from_arrays(cls, ticker, arrays, index, **kwargs):
+        """
+        Builds an engine over existing market arrays (e.g. shared-memory views)
+        instead of reading parquet. `arrays` maps each of MARKET_COLUMNS to a
+        float64 array; the kernel works on those arrays directly and `data`
+        only carries the index, so the columns are never copied.
+        """
+        return cls(ticker, data=pd.DataFrame(index=index), arrays=arrays, **kwargs)
+
+    def market_arrays(self):
+        """The MARKET_COLUMNS arrays the execution kernel reads."""
+        return dict(zip(MARKET_COLUMNS, (self._prices, self._smas, self._atrs, self._vols)))
 
     def _load_data(self):
         path = f"{DATA_DIR}/{self.ticker}_processed.parquet"
         if not os.path.exists(path):
             raise FileNotFoundError(f"🚨 Missing Data for {self.ticker}")
         df = pd.read_parquet(path)
-        
+
         # --- NEW: REGIME INDICATOR (The 200 SMA) ---
         df['SMA_200'] = df['Close'].rolling(window=200).mean()
         df['ATR_Proxy'] = df['Close'] * df['Volatility_20d']
         return df
 
+    def fingerprint(self):
+        """Identifies the dataset a score was computed on: ticker, rows, last bar."""
+        return f"{self.ticker}:{len(self.data)}:{self.data.index[-1]}"
+
     def save_params(self, params):
         with open(PARAM_FILE, 'w') as f:
             json.dump(params, f, indent=2)
@@ -40,127 +436,313 @@ class QuantEngine:
         with open(PARAM_FILE, 'r') as f:
             return json.load(f)
 
-    def run_backtest(self, params, detailed_report=False):
-        df = self.data.copy()
-        
-        # --- GENES ---
-        w_trend = params.get('w_trend', 0.5)
-        w_mean_rev = params.get('w_mean_rev', 0.5)
-        w_vol = params.get('w_vol', 0.5)
-        rsi_period = int(params.get('rsi_period', 14))
-        buy_thresh = params.get('buy_thresh', 0.2)
-        sell_thresh = params.get('sell_thresh', 0.2)
-        sl_mult = params.get('sl_multiplier', 2.0)
-        tp_mult = params.get('tp_multiplier', 3.0)
+    def _column(self, name):
+        values = np.ascontiguousarray(self.data[name].values, dtype=np.float64)
+        values.flags.writeable = False
+        return values
 
-        # --- SIGNALS ---
+    def _compute_indicator(self, name, window):
+        close = pd.Series(self._prices, copy=False)
+        if name == 'sma':
+            values = close.rolling(window=window).mean()
+        elif name == 'rsi':
+            delta = close.diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+            rs = gain / loss
+            values = 100 - (100 / (1 + rs))
+        else:
+            raise ValueError(f"Unknown indicator: {name}")
+        return np.ascontiguousarray(values.values, dtype=np.float64)
+
+    def indicator(self, name, window):
+        """
+        Returns the ('sma' | 'rsi', window) series as a read-only float64 array.
+        Results are memoized in a bounded LRU shared by every backtest call,
+        so an optimizer run computes each RSI period once, not once per genome.
+        """
+        key = (name, int(window))
+        values = self._indicators.get(key)
+        if values is not None:
+            self.cache_hits += 1
+            self._indicators.move_to_end(key)
+            return values
+
+        self.cache_misses += 1
+        values = self._compute_indicator(name, key[1])
+        values.flags.writeable = False
+        self._indicators[key] = values
+        if len(self._indicators) > self.cache_size:
+            self._indicators.popitem(last=False)
+        return values
+
+    def cache_stats(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._indicators),
+        }
+
+    def _base_signals(self):
+        """Genome-independent pieces of the signal: trend and volatility votes."""
         # Trend
-        sma_fast = df['Close'].rolling(window=20).mean()
-        sma_slow = df['Close'].rolling(window=50).mean()
+        sma_fast = self.indicator('sma', 20)
+        sma_slow = self.indicator('sma', 50)
         trend_signal = np.where(sma_fast > sma_slow, 1.0, -1.0)
 
-        # RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        rsi_signal = (50 - rsi) / 50 
+        vol_signal = np.where(self._vols > VOL_CEILING, -1.0, 1.0)
+        return trend_signal, vol_signal
+
+    def _rsi_signal(self, rsi_period):
+        return (50 - self.indicator('rsi', rsi_period)) / 50
+
+    def run_backtest(self, params, detailed_report=False, cutoff=None, max_drawdown=None, ledger=False):
+        """
+        Backtests one genome. Returns the fitness, or the detailed report dict
+        (a bare DEAD_SCORE float when the strategy traded too little).
+
+        Early abort (opt-in): pass `cutoff`, the score a genome must beat (e.g.
+        the worst surviving score), and/or `max_drawdown`, a drawdown floor as a
+        fraction (e.g. -0.5). Genomes that provably cannot satisfy them stop
+        early and return ABORTED_SCORE.
+
+        With `ledger=True` returns (result, ledger): the closed trades as
+        columns "entry" / "exit" (bar positions), "reason" (EVENT_* code) and
+        "pnl" (fractional return), plus the per-bar "equity" curve.
+        """
+        genes = _genes(params)
+        min_trades, dd_floor = _abort_limits(cutoff, max_drawdown)
+
+        # --- SIGNALS ---
+        trend_signal, vol_signal = self._base_signals()
+        rsi_signal = self._rsi_signal(genes['rsi_period'])
 
-        vol_signal = np.where(df['Volatility_20d'] > 0.04, -1.0, 1.0)
-        
         # Mix Signals
-        raw_score = (w_trend * trend_signal) + (w_mean_rev * rsi_signal) + (w_vol * vol_signal)
+        raw_score = (genes['w_trend'] * trend_signal) + (genes['w_mean_rev'] * rsi_signal) + (genes['w_vol'] * vol_signal)
 
         # --- EXECUTION LOOP (REGIME AWARE) ---
-        prices = df['Close'].values
-        smas = df['SMA_200'].values  # <--- NEW INPUT
-        atrs = df['ATR_Proxy'].values
-        signals = raw_score.values
-        
-        balance = 1000.0
-        position = 0
-        entry_price = 0.0
-        stop_price = 0.0
-        target_price = 0.0
-        
-        equity_curve = []
-        trades = []
-        
-        for i in range(len(prices)):
-            price = prices[i]
-            sma = smas[i]
-            
-            # Skip if SMA not calculated yet (first 200 days)
-            if np.isnan(sma): 
-                equity_curve.append(balance)
-                continue
-                
-            # DETERMINE REGIME
-            is_bull_market = price > sma
-            
-            if position == 1:
-                # Exits (Same as before)
-                if price < stop_price:
-                    balance *= (stop_price / entry_price)
-                    position = 0
-                    trades.append(-1)
-                elif price > target_price:
-                    balance *= (target_price / entry_price)
-                    position = 0
-                    trades.append(1)
-                elif signals[i] < -sell_thresh:
-                    pnl = (price - entry_price) / entry_price
-                    balance *= (1 + pnl)
-                    position = 0
-                    trades.append(1 if pnl > 0 else -1)
-            
-            elif position == 0:
-                if signals[i] > buy_thresh:
-                    # 🛑 THE REGIME FILTER 🛑
-                    # If we are in a Bear Market (Price < SMA), we IGNORE Trend Signals.
-                    # We only buy if the Mean Reversion signal (RSI) is screaming "Cheap!"
-                    
-                    allow_trade = True
-                    if not is_bull_market:
-                        # In Bear Market, enforce stricter rules
-                        # Only buy if RSI signal is extremely strong (> 0.6)
-                        if signals[i] < 0.3: # Hardcoded safety filter
-                            allow_trade = False
-                    
-                    if allow_trade:
-                        position = 1
-                        entry_price = price
-                        stop_price = entry_price - (atrs[i] * sl_mult)
-                        target_price = entry_price + (atrs[i] * tp_mult)
-            
-            val = balance * (price / entry_price) if position == 1 else balance
-            equity_curve.append(val)
+        n_bars = len(self._prices)
+        equity = np.empty((1, n_bars), dtype=np.float64)
+        trades = np.empty(n_bars, dtype=np.int8)
+        trade_bars = np.empty((3, n_bars // 2 + 1), dtype=np.int64) if ledger else None
+        execute = _execute_into_jit if self.compiled else _execute_into
+        trade_count, aborted_at = execute(
+            self._prices, self._smas, self._atrs, raw_score,
+            float(genes['buy_thresh']), float(genes['sell_thresh']),
+            float(genes['sl_mult']), float(genes['tp_mult']),
+            equity[0], trades, min_trades, dd_floor, trade_bars
+        )
 
         # --- SCORING ---
-        equity_series = pd.Series(equity_curve)
-        total_return = (equity_series.iloc[-1] - 1000.0) / 1000.0
-        peak = equity_series.cummax()
-        drawdown = (equity_series - peak) / peak
-        max_drawdown = drawdown.min()
-        trade_count = len(trades)
-
-        if trade_count < 40: return -999.0
-
-        returns = equity_series.pct_change().dropna()
-        if returns.std() == 0: sharpe = -1.0
-        else: sharpe = (returns.mean() * 252) / (returns.std() * np.sqrt(252))
-
-        # Reward Safety more now
-        fitness = sharpe + (total_return * 1.5) + (max_drawdown * 8.0) # Heavier penalty for DD
-        
+        scores = _score_equity(equity, np.array([trade_count]), np.array([aborted_at]))
+        result = _report(scores, 0) if detailed_report else float(scores["fitness"][0])
+        if not ledger:
+            return result
+
+        entries, exits, reasons = trade_bars[:, :trade_count]
+        return result, {
+            "entry": entries,
+            "exit": exits,
+            "reason": reasons.astype(np.int8),
+            # The entry bar's equity is the balance going in (price / entry == 1)
+            "pnl": equity[0, exits] / equity[0, entries] - 1,
+            "equity": equity[0],
+        }
+
+    def run_backtest_batch(self, params_list, detailed_report=False, cutoff=None, max_drawdown=None):
+        """
+        Scores a whole population in one pass.
+        Returns an array of fitness values (same values as `run_backtest`),
+        plus the list of per-genome reports when `detailed_report` is set.
+        `cutoff` / `max_drawdown` enable early abort as in `run_backtest`.
+        """
+        genes = [_genes(p) for p in params_list]
+        min_trades, dd_floor = _abort_limits(cutoff, max_drawdown)
+        column = lambda k: np.array([g[k] for g in genes], dtype=np.float64)
+
+        # --- SIGNAL MATRIX (genomes x bars) ---
+        trend_signal, vol_signal = self._base_signals()
+        periods = [g['rsi_period'] for g in genes]
+        unique_periods = sorted(set(periods))
+        rsi_rows = np.vstack([self._rsi_signal(p) for p in unique_periods])
+        rsi_matrix = rsi_rows[[unique_periods.index(p) for p in periods]]
+
+        raw_scores = (column('w_trend')[:, None] * trend_signal[None, :]) \
+            + (column('w_mean_rev')[:, None] * rsi_matrix) \
+            + (column('w_vol')[:, None] * vol_signal[None, :])
+
+        # --- EXECUTION (all genomes at once) ---
+        equity = np.empty(raw_scores.shape, dtype=np.float64)
+        trades = np.empty(raw_scores.shape, dtype=np.int8)
+        execute = _execute_batch_jit if self.compiled else _execute_batch
+        trade_counts, aborted = execute(
+            self._prices, self._smas, self._atrs, np.ascontiguousarray(raw_scores),
+            column('buy_thresh'), column('sell_thresh'),
+            column('sl_mult'), column('tp_mult'),
+            equity, trades, min_trades, dd_floor
+        )
+
+        scores = _score_equity(equity, trade_counts, aborted)
         if detailed_report:
-            return {
-                "Final Balance": equity_series.iloc[-1],
-                "Total Return %": total_return * 100,
-                "Max Drawdown %": max_drawdown * 100,
-                "Trades": trade_count,
-                "Sharpe": sharpe
-            }
-            
-        return fitness
+            return scores["fitness"], [_report(scores, g) for g in range(len(genes))]
+        return scores["fitness"]
+
+    def walk_forward(self, params, mode="walk_forward", n_folds=5, train_bars=None, test_bars=None,
+                     detailed_report=False, train=True):
+        """
+        Scores one genome on every fold of `fold_windows` in a single kernel
+        call. Indicators and the signal are computed once over the full series
+        and each window runs on views of them, so SMA_200/RSI are already warm
+        at a window's first bar. Folds start at the first bar with a valid
+        SMA_200. MIN_TRADES is scaled to each window's share of the series.
+
+        Returns {"folds": [...], "train": [...], "test": [...]} where train/test
+        hold the fitness (or the detailed report) per fold; k-fold has no
+        contiguous train window, so its train entries are None. With
+        `train=False` only the test windows are run (train entries are None).
+        """
+        genes = _genes(params)
+        trend_signal, vol_signal = self._base_signals()
+        raw_score = (genes['w_trend'] * trend_signal) \
+            + (genes['w_mean_rev'] * self._rsi_signal(genes['rsi_period'])) \
+            + (genes['w_vol'] * vol_signal)
+
+        n_bars = len(self._prices)
+        first_valid = int(np.argmax(~np.isnan(self._smas)))
+        folds = fold_windows(n_bars, first_valid, mode, n_folds, train_bars, test_bars)
+
+        windows = []
+        for train_start, train_stop, test_start, test_stop in folds:
+            if train and train_start is not None:
+                windows.append((train_start, train_stop))
+            windows.append((test_start, test_stop))
+        starts = np.array([w[0] for w in windows], dtype=np.int64)
+        stops = np.array([w[1] for w in windows], dtype=np.int64)
+        lengths = stops - starts
+
+        equity = np.full((len(windows), int(lengths.max())), np.nan, dtype=np.float64)
+        trades = np.empty(equity.shape, dtype=np.int8)
+        execute = _execute_windows_jit if self.compiled else _execute_windows
+        trade_counts = execute(
+            self._prices, self._smas, self._atrs, raw_score, starts, stops,
+            float(genes['buy_thresh']), float(genes['sell_thresh']),
+            float(genes['sl_mult']), float(genes['tp_mult']),
+            equity, trades
+        )
+
+        # Score equal-length windows together (all train folds, all test folds)
+        results = [None] * len(windows)
+        for length in np.unique(lengths):
+            rows = np.flatnonzero(lengths == length)
+            min_trades = max(1, int(round(MIN_TRADES * length / n_bars)))
+            scores = _score_equity(equity[rows, :length], trade_counts[rows], min_trades=min_trades)
+            for i, w in enumerate(rows):
+                results[w] = _report(scores, i) if detailed_report else float(scores["fitness"][i])
+
+        out = {"folds": folds, "train": [], "test": []}
+        for train_start, _, _, _ in folds:
+            out["train"].append(results.pop(0) if train and train_start is not None else None)
+            out["test"].append(results.pop(0))
+        return out
+
+
+class MultiAssetEngine:
+    """
+    Several QuantEngines stacked into (assets x bars) tensors.
+    Row `a` holds asset a's own bars left-aligned (NaN padded), so per-asset
+    results match QuantEngine.run_backtest exactly; `bar_index[a, k]` is the
+    position of that bar on the common (union) `index`, see `align()`.
+    """
+
+    def __init__(self, engines, compiled=True):
+        self.engines = [QuantEngine(e, compiled=compiled) if isinstance(e, str) else e for e in engines]
+        if not self.engines:
+            raise ValueError("MultiAssetEngine needs at least one asset")
+        self.tickers = [e.ticker for e in self.engines]
+        self.compiled = compiled and NUMBA_AVAILABLE
+
+        self.index = self.engines[0].data.index
+        for engine in self.engines[1:]:
+            self.index = self.index.union(engine.data.index)
+
+        self.lengths = np.array([len(e.data) for e in self.engines], dtype=np.int64)
+        n_assets, n_bars = len(self.engines), int(self.lengths.max())
+        self.bar_index = np.full((n_assets, n_bars), -1, dtype=np.int64)
+        for a, engine in enumerate(self.engines):
+            self.bar_index[a, :self.lengths[a]] = self.index.get_indexer(engine.data.index)
+
+        self.prices = self._stack([e._prices for e in self.engines])
+        self.smas = self._stack([e._smas for e in self.engines])
+        self.atrs = self._stack([e._atrs for e in self.engines])
+        base = [e._base_signals() for e in self.engines]
+        self.trend_signal = self._stack([b[0] for b in base])
+        self.vol_signal = self._stack([b[1] for b in base])
+
+    @classmethod
+    def from_data_dir(cls, compiled=True):
+        """Every ticker with a processed parquet file in DATA_DIR."""
+        paths = sorted(glob.glob(f"{DATA_DIR}/*_processed.parquet"))
+        tickers = [os.path.basename(p)[:-len("_processed.parquet")] for p in paths]
+        return cls(tickers, compiled=compiled)
+
+    def _stack(self, rows):
+        out = np.full((len(rows), self.bar_index.shape[1]), np.nan, dtype=np.float64)
+        for a, row in enumerate(rows):
+            out[a, :len(row)] = row
+        return out
+
+    def align(self, values):
+        """Scatters a (..., assets, bars) array onto the common index (NaN where an asset has no bar)."""
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(values.shape[:-1] + (len(self.index),), np.nan)
+        for a in range(len(self.engines)):
+            n = self.lengths[a]
+            out[..., a, self.bar_index[a, :n]] = values[..., a, :n]
+        return out
+
+    def evaluate(self, params):
+        """Returns the (assets x STAT_COLUMNS) matrix for one genome."""
+        return self.evaluate_batch([params])[0]
+
+    def evaluate_batch(self, params_list, early_abort=False):
+        """
+        Scores every genome on every asset in one kernel call.
+        Returns a (genomes x assets x STAT_COLUMNS) array; assets with fewer
+        than MIN_TRADES trades are dead strategies (run_backtest's -999).
+        With `early_abort`, cells stop as soon as MIN_TRADES is out of reach;
+        they report the trades counted so far (still < MIN_TRADES) and NaN for
+        the other statistics.
+        """
+        genes = [_genes(p) for p in params_list]
+        column = lambda k: np.array([g[k] for g in genes], dtype=np.float64)
+
+        periods = [g['rsi_period'] for g in genes]
+        unique_periods = sorted(set(periods))
+        rsi_by_period = np.stack([
+            self._stack([e._rsi_signal(p) for e in self.engines]) for p in unique_periods
+        ])
+        rsi = rsi_by_period[[unique_periods.index(p) for p in periods]]
+
+        raw_scores = (column('w_trend')[:, None, None] * self.trend_signal[None]) \
+            + (column('w_mean_rev')[:, None, None] * rsi) \
+            + (column('w_vol')[:, None, None] * self.vol_signal[None])
+
+        equity = np.full(raw_scores.shape, np.nan, dtype=np.float64)
+        trades = np.empty(raw_scores.shape, dtype=np.int8)
+        execute = _execute_grid_jit if self.compiled else _execute_grid
+        trade_counts, aborted = execute(
+            self.prices, self.smas, self.atrs, np.ascontiguousarray(raw_scores), self.lengths,
+            column('buy_thresh'), column('sell_thresh'),
+            column('sl_mult'), column('tp_mult'),
+            equity, trades, MIN_TRADES if early_abort else 0, -np.inf
+        )
+
+        stats = np.empty((len(genes), len(self.engines), len(STAT_COLUMNS)), dtype=np.float64)
+        for a in range(len(self.engines)):
+            scores = _score_equity(equity[:, a, :self.lengths[a]], trade_counts[:, a])
+            stats[:, a, 0] = scores["sharpe"]
+            stats[:, a, 1] = scores["total_return"] * 100
+            stats[:, a, 2] = scores["max_drawdown"] * 100
+            stats[:, a, 3] = scores["trades"]
+        stats[aborted >= 0, :3] = np.nan
+        return stats
@@ -0,0 +1,70 @@
+"""
+SRCL ELITE - OPTIMIZER CHECKPOINTS
+----------------------------------
+Per-generation optimizer state in one compressed .npz file.
+1. save_checkpoint() writes a temp file and os.replace()s it, so a crash
+   mid-write leaves the previous generation's checkpoint intact.
+2. Lists of genome dicts are stored as a (population x genes) float matrix
+   plus the gene names; other non-array values (RNG states, best genome,
+   history) go into one JSON string.
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+
+
+def save_checkpoint(path, state):
+    """`state` maps names to arrays, lists of genome dicts or JSON-able values."""
+    arrays, meta = {}, {}
+    for key, value in state.items():
+        if isinstance(value, np.ndarray):
+            arrays[key] = value
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            names = list(value[0])
+            arrays[key + ".genes"] = np.array([[g[k] for k in names] for g in value], dtype=np.float64)
+            meta[key + ".names"] = names
+            meta[key + ".integers"] = [k for k in names if isinstance(value[0][k], int)]
+        else:
+            meta[key] = value
+    arrays["meta"] = np.array(json.dumps(meta))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        state = {}
+        for key in data.files:
+            if key == "meta":
+                continue
+            if key.endswith(".genes"):
+                name = key[:-len(".genes")]
+                names = meta.pop(name + ".names")
+                integers = set(meta.pop(name + ".integers"))
+                state[name] = [
+                    {k: int(v) if k in integers else float(v) for k, v in zip(names, row)}
+                    for row in data[key]
+                ]
+            else:
+                state[key] = data[key]
+    state.update(meta)
+    return state
+
+
+def get_random_state():
+    """The `random` module's state as JSON-able data."""
+    version, internal, gauss_next = random.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def set_random_state(state):
+    version, internal, gauss_next = state
+    random.setstate((version, tuple(internal), gauss_next))
@@ -0,0 +1,78 @@
+"""
+SRCL ELITE - FITNESS CACHE
+--------------------------
+Memoizes genome scores for the genetic optimizers.
+1. Key = canonical hash of the genome dict + a dataset fingerprint.
+2. Elites and un-mutated children are never re-backtested.
+3. Optionally persisted to a JSON file so later runs start warm.
+"""
+
+import hashlib
+import json
+import os
+
+
+def genome_key(genome, fingerprint=""):
+    """Stable hash of a genome: sorted keys, numbers normalized to float."""
+    canonical = {k: float(v) for k, v in genome.items()}
+    payload = json.dumps(canonical, sort_keys=True) + "|" + fingerprint
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FitnessCache:
+    def __init__(self, fingerprint, path=None):
+        self.fingerprint = fingerprint
+        self.path = path
+        self.scores = {}
+        self.hits = 0
+        self.misses = 0
+        self.last_hits = 0
+        self.last_misses = 0
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.scores = json.load(f)
+
+    def key(self, genome):
+        return genome_key(genome, self.fingerprint)
+
+    def get(self, genome):
+        return self.scores.get(self.key(genome))
+
+    def put(self, genome, score):
+        self.scores[self.key(genome)] = float(score)
+
+    def evaluate(self, population, score_fn):
+        """
+        Scores a population, calling `score_fn(genomes) -> scores` once with
+        only the unseen (deduplicated) genomes. Returns scores in population order.
+        """
+        keys = [self.key(g) for g in population]
+        pending = {}
+        for key, genome in zip(keys, population):
+            if key not in self.scores and key not in pending:
+                pending[key] = genome
+
+        if pending:
+            fresh = score_fn(list(pending.values()))
+            for key, score in zip(pending.keys(), fresh):
+                self.scores[key] = float(score)
+
+        self.last_misses = len(pending)
+        self.last_hits = len(population) - self.last_misses
+        self.hits += self.last_hits
+        self.misses += self.last_misses
+        return [self.scores[key] for key in keys]
+
+    @property
+    def last_hit_rate(self):
+        total = self.last_hits + self.last_misses
+        return self.last_hits / total if total else 0.0
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.scores, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,89 @@
+"""
+SRCL ELITE - ISLAND MODEL
+-------------------------
+Runs K sub-populations in separate processes on one box.
+1. Each island evolves on its own; no per-genome IPC with a master.
+2. Every few generations an island sends its top genomes to its neighbours
+   (`migration_targets`) through one multiprocessing.Queue per island.
+3. Migration is synchronous and immigrants are ordered by source island, so
+   a run is reproducible given the islands' seeds.
+
+Usage:
+    results = run_islands(evolve_island, [(seed,) for seed in seeds], topology="ring")
+"""
+
+import os
+import queue
+import multiprocessing as mp
+
+TOPOLOGIES = ("ring", "full")
+
+
+def migration_targets(topology, n_islands, island):
+    """Islands that `island` sends its migrants to."""
+    if topology == "ring":
+        return [(island + 1) % n_islands] if n_islands > 1 else []
+    if topology == "full":
+        return [i for i in range(n_islands) if i != island]
+    raise ValueError(f"Unknown topology: {topology} (expected one of {TOPOLOGIES})")
+
+
+class Migration:
+    """An island's end of the migration queues, passed to the island function."""
+
+    def __init__(self, island, n_islands, topology, inboxes):
+        self.island = island
+        self.n_islands = n_islands
+        self.targets = migration_targets(topology, n_islands, island)
+        self.sources = [i for i in range(n_islands) if island in migration_targets(topology, n_islands, i)]
+        self._inboxes = inboxes
+
+    def exchange(self, migrants):
+        """Sends `migrants` to every target and waits for each source's migrants."""
+        for target in self.targets:
+            self._inboxes[target].put((self.island, list(migrants)))
+        arrivals = sorted(self._inboxes[self.island].get() for _ in self.sources)
+        return [genome for _, genomes in arrivals for genome in genomes]
+
+
+def _island_entry(island_fn, migration, args, results):
+    try:
+        # Islands are the parallelism; split the cores between their kernels
+        import numba
+        numba.set_num_threads(max(1, (os.cpu_count() or 1) // migration.n_islands))
+    except ImportError:
+        pass
+    results.put((migration.island, island_fn(migration, *args)))
+
+
+def run_islands(island_fn, island_args, topology="ring"):
+    """
+    Starts one process per entry of `island_args` running
+    `island_fn(migration, *args)` (a module-level function), and returns
+    their return values in island order.
+    """
+    n_islands = len(island_args)
+    migration_targets(topology, n_islands, 0) # Validate before starting processes
+    inboxes = [mp.Queue() for _ in range(n_islands)]
+    results = mp.Queue()
+    processes = [
+        mp.Process(target=_island_entry,
+                   args=(island_fn, Migration(k, n_islands, topology, inboxes), args, results))
+        for k, args in enumerate(island_args)
+    ]
+    for process in processes:
+        process.start()
+    collected = {}
+    while len(collected) < n_islands:
+        try:
+            island, result = results.get(timeout=1.0)
+            collected[island] = result
+        except queue.Empty:
+            crashed = [k for k, p in enumerate(processes) if p.exitcode not in (None, 0)]
+            if crashed:
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError(f"Island process(es) {crashed} crashed")
+    for process in processes:
+        process.join()
+    return [collected[k] for k in range(n_islands)]
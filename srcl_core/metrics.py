@@ -0,0 +1,180 @@
+"""
+SRCL ELITE - FIELD METRICS
+--------------------------
+Compiled entropy / coherence kernels shared by the simulations.
+1. Histograms are one pass with integer bin indices; edges come from
+   np.histogram_bin_edges and out-of-range values are dropped, so the counts
+   equal np.histogram's.
+2. gradient_coherence fuses np.gradient (central differences, one-sided at
+   the borders), the magnitude and the mean.
+3. Every metric takes a 2-D field (-> float) or a (B, N, N) stack of fields
+   (-> length-B array, members in parallel).
+"""
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(inline="always")
+def _bin_counts(values, edges, counts):
+    n_bins = counts.shape[0]
+    first = edges[0]
+    last = edges[n_bins]
+    scale = n_bins / (float(last) - float(first))
+    for x in values:
+        if not (x >= first and x <= last):
+            continue
+        idx = min(int((float(x) - float(first)) * scale), n_bins - 1)
+        # Same edge rules as np.histogram: [edge_i, edge_i+1), last bin closed
+        if x < edges[idx]:
+            idx -= 1
+        elif idx < n_bins - 1 and x >= edges[idx + 1]:
+            idx += 1
+        counts[idx] += 1
+
+
+@njit(inline="always")
+def _gradient_coherence(f):
+    n, m = f.shape
+    total = 0.0
+    for i in range(n):
+        # np.gradient: central differences inside, one-sided at the borders
+        ip = min(i + 1, n - 1)
+        im = max(i - 1, 0)
+        hx = 1.0 if (i == 0 or i == n - 1) else 0.5
+        gx = (f[ip, 0] - f[im, 0]) * hx
+        gy = f[i, 1] - f[i, 0]
+        total += math.sqrt(gx * gx + gy * gy)
+        for j in range(1, m - 1):
+            gx = (f[ip, j] - f[im, j]) * hx
+            gy = (f[i, j + 1] - f[i, j - 1]) * 0.5
+            total += math.sqrt(gx * gx + gy * gy)
+        gx = (f[ip, m - 1] - f[im, m - 1]) * hx
+        gy = f[i, m - 1] - f[i, m - 2]
+        total += math.sqrt(gx * gx + gy * gy)
+    return total / (n * m)
+
+
+@njit(inline="always")
+def _rms_difference(a, c):
+    total = 0.0
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            d = a[i, j] - c[i, j]
+            total += d * d
+    return math.sqrt(total / (a.shape[0] * a.shape[1]))
+
+
+# Single fields run serially (no thread-pool launch on the per-step path);
+# stacks spread their members over the cores.
+
+@njit(cache=True)
+def _field_bin_counts(values, edges, counts):
+    _bin_counts(values, edges, counts)
+
+
+@njit(parallel=True, cache=True)
+def _batch_bin_counts(values, edges, counts):
+    for b in prange(values.shape[0]):
+        _bin_counts(values[b], edges[b], counts[b])
+
+
+@njit(cache=True)
+def _field_gradient_coherence(f):
+    return _gradient_coherence(f)
+
+
+@njit(parallel=True, cache=True)
+def _batch_gradient_coherence(fields):
+    out = np.empty(fields.shape[0])
+    for b in prange(fields.shape[0]):
+        out[b] = _gradient_coherence(fields[b])
+    return out
+
+
+@njit(cache=True)
+def _field_rms_difference(a, c):
+    return _rms_difference(a, c)
+
+
+@njit(parallel=True, cache=True)
+def _batch_rms_difference(a, c):
+    out = np.empty(a.shape[0])
+    for b in prange(a.shape[0]):
+        out[b] = _rms_difference(a[b], c[b])
+    return out
+
+
+def _check_shape(field):
+    field = np.asarray(field)
+    if field.ndim not in (2, 3):
+        raise ValueError(f"Expected a 2-D field or a (B, N, N) stack, got shape {field.shape}")
+    return field
+
+
+def histogram_counts(field, bins, range=None):
+    """
+    np.histogram(field, bins, range) counts and edges; (B, bins) counts and
+    (B, bins + 1) edges for a stack. Without `range`, each member uses its
+    own min/max.
+    """
+    field = _check_shape(field)
+    if field.ndim == 2:
+        values = field.ravel()
+        edges = np.histogram_bin_edges(values, bins, range)
+        counts = np.zeros(bins, dtype=np.int64)
+        _field_bin_counts(values, edges, counts)
+        return counts, edges
+
+    values = field.reshape(len(field), -1)
+    if range is None:
+        edges = np.stack([np.histogram_bin_edges(v, bins) for v in values])
+    else:
+        edges = np.repeat(np.histogram_bin_edges(values[0], bins, range)[None], len(values), axis=0)
+    counts = np.zeros((len(values), bins), dtype=np.int64)
+    _batch_bin_counts(values, edges, counts)
+    return counts, edges
+
+
+def _entropy_sum(h):
+    # -sum(h log h) over the last axis, empty bins skipped
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(h > 0, h * np.log(h), 0.0)
+    result = -terms.sum(axis=-1)
+    return float(result) if result.ndim == 0 else result
+
+
+def shannon_entropy(field, bins=100, range=(0.0, 1.0), base=2.0):
+    """Entropy of the binned value distribution (probabilities, empty bins skipped)."""
+    counts, _ = histogram_counts(field, bins, range)
+    p = counts / counts.sum(axis=-1, keepdims=True)
+    return _entropy_sum(p) / math.log(base)
+
+
+def density_entropy(field, bins=50, range=None, eps=0.0):
+    """
+    -sum(h log h) over the np.histogram(density=True) bins h, after adding
+    `eps` to every bin; bins that are still empty are skipped.
+    """
+    counts, edges = histogram_counts(field, bins, range)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = counts / np.diff(edges, axis=-1) / counts.sum(axis=-1, keepdims=True) + eps
+    return _entropy_sum(h)
+
+
+def gradient_coherence(field):
+    """mean(sqrt(gx^2 + gy^2)) with (gx, gy) = np.gradient(field)."""
+    field = _check_shape(field)
+    if field.ndim == 2:
+        return _field_gradient_coherence(field)
+    return _batch_gradient_coherence(field)
+
+
+def rms_difference(a, b):
+    """sqrt(mean((a - b)^2))."""
+    a, b = _check_shape(a), _check_shape(b)
+    if a.ndim == 2:
+        return _field_rms_difference(a, b)
+    return _batch_rms_difference(a, b)
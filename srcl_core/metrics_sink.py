@@ -0,0 +1,154 @@
+"""
+SRCL ELITE - METRICS SINK
+-------------------------
+Buffered, decimated per-step metrics logging for the simulations.
+1. `due(step, steps)` samples every `every`-th step plus the final step, so
+   callers only compute metrics on the steps that get logged.
+2. Rows are batched in memory and flushed when `batch_size` rows are
+   pending or `flush_seconds` have passed (and on close): one open/write per
+   batch instead of one per step.
+3. Formats, picked from the extension unless given: "jsonl" (one JSON object
+   per line, appended), "binary" (.bin: appended .npy record chunks, see
+   read_metrics), "parquet" (one row group per flush; needs pyarrow and
+   replaces an existing file) and "dataset" (a directory, or a path without
+   extension: every flush adds one complete part file, so the store is
+   append-only and readable at any time).
+
+Usage:
+    with MetricsSink("data/logs/metrics_log.bin", every=10) as sink:
+        for t in range(steps):
+            ...
+            if sink.due(t, steps):
+                sink.write({"step": t, "coherence_A": coherence(A)})
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+FORMATS = {".jsonl": "jsonl", ".json": "jsonl", ".bin": "binary", ".npy": "binary", ".parquet": "parquet"}
+
+
+def infer_format(path):
+    path = str(path)
+    if os.path.isdir(path) or not os.path.splitext(path)[1]:
+        return "dataset"
+    return FORMATS.get(os.path.splitext(path)[1].lower(), "jsonl")
+
+
+def _records(rows):
+    # One structured array per batch: integer columns stay int64, the rest float64
+    columns = list(rows[0])
+    dtype = [(c, np.int64 if isinstance(rows[0][c], (int, np.integer)) else np.float64) for c in columns]
+    return np.array([tuple(r[c] for c in columns) for r in rows], dtype=dtype)
+
+
+class MetricsSink:
+    def __init__(self, path=None, format=None, every=1, batch_size=256, flush_seconds=5.0):
+        """Without a `path` nothing is written; due() still applies the sampling."""
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.path = str(path) if path else None
+        self.format = format or (infer_format(path) if path else None)
+        if self.format not in (None, "jsonl", "binary", "parquet", "dataset"):
+            raise ValueError(f"Unknown metrics format: {self.format}")
+        self.every = every
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rows_written = 0
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._writer = None # pyarrow ParquetWriter, opened on the first flush
+        # Dataset parts: part-<timestamp>-<pid>-<n>.parquet, unique per sink
+        self._part_prefix = f"part-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{os.getpid()}"
+        self._parts = 0
+
+        if not self.path:
+            return
+        if self.format == "dataset":
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.format in ("parquet", "dataset"):
+            import pyarrow.parquet # noqa: F401 (fail at construction, not mid-run)
+
+    def due(self, step, steps):
+        """True if `step` (0-based, of `steps`) is sampled."""
+        return step % self.every == 0 or step == steps - 1
+
+    def write(self, row):
+        if not self.path:
+            return
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        if self.format == "jsonl":
+            with open(self.path, "a") as f:
+                f.writelines(json.dumps(r) + "\n" for r in rows)
+        elif self.format == "binary":
+            with open(self.path, "ab") as f:
+                np.lib.format.write_array(f, _records(rows), allow_pickle=False)
+        elif self.format == "dataset":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            name = f"{self._part_prefix}-{self._parts:05d}.parquet"
+            # Readers skip dot-files, so a half-written part is never seen
+            tmp_path = os.path.join(self.path, f".{name}.tmp")
+            pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+            os.replace(tmp_path, os.path.join(self.path, name))
+            self._parts += 1
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist(rows)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_metrics(path, format=None):
+    """All rows of a metrics log as a pandas DataFrame (unparsable JSONL lines, e.g. a torn last line, are skipped)."""
+    import pandas as pd
+
+    path = str(path)
+    format = format or infer_format(path)
+    if format == "jsonl":
+        rows = []
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return pd.DataFrame(rows)
+    if format in ("parquet", "dataset"):
+        return pd.read_parquet(path)
+
+    chunks = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        while f.tell() < size:
+            chunks.append(np.lib.format.read_array(f, allow_pickle=False))
+    return pd.DataFrame(np.concatenate(chunks)) if chunks else pd.DataFrame()
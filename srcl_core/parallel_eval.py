@@ -0,0 +1,125 @@
+"""
+SRCL ELITE - PARALLEL FITNESS EVALUATOR
+---------------------------------------
+Scores genomes on a process pool that is started once per optimizer run.
+1. Each ticker's Close/SMA_200/ATR_Proxy/Volatility_20d arrays are placed in
+   multiprocessing.shared_memory; workers build their QuantEngines on views.
+2. Genomes are sent in contiguous chunks and scored with run_backtest_batch.
+3. Scores depend only on the genome, so results are identical for any
+   worker count.
+
+Usage:
+    with ParallelEvaluator(["BTC-USD"]) as evaluator:
+        scores = evaluator.map(genomes)
+"""
+
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from srcl_core.backtest_engine import QuantEngine, MARKET_COLUMNS
+
+# Worker-side state, filled once by _init_worker
+_ENGINES = {}
+_SHARED = []
+_OBJECTIVE = None
+
+
+def backtest_objective(engines, genomes, **kwargs):
+    """Default objective: run_backtest fitness on the first ticker."""
+    engine = next(iter(engines.values()))
+    return engine.run_backtest_batch(genomes, **kwargs)
+
+
+def walk_forward_objective(engines, genomes, n_folds=5, **kwargs):
+    """
+    Robustness objective: mean out-of-sample (test fold) fitness on the first
+    ticker; train windows are not run. Early-abort arguments are accepted but
+    not applied per fold.
+    """
+    engine = next(iter(engines.values()))
+    return [float(np.mean(engine.walk_forward(g, n_folds=n_folds, train=False)["test"])) for g in genomes]
+
+
+def _init_worker(layouts, objective):
+    global _OBJECTIVE
+    try:
+        # Parallelism comes from the pool; keep each worker's kernel single-threaded
+        import numba
+        numba.set_num_threads(1)
+    except ImportError:
+        pass
+
+    for ticker, shm_name, n_bars, index in layouts:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _SHARED.append(shm)
+        block = np.ndarray((len(MARKET_COLUMNS), n_bars), dtype=np.float64, buffer=shm.buf)
+        block.flags.writeable = False
+        arrays = {column: block[row] for row, column in enumerate(MARKET_COLUMNS)}
+        _ENGINES[ticker] = QuantEngine.from_arrays(ticker, arrays, index)
+    _OBJECTIVE = objective
+
+
+def _evaluate_chunk(task):
+    genomes, kwargs = task
+    return [float(score) for score in _OBJECTIVE(_ENGINES, genomes, **kwargs)]
+
+
+class ParallelEvaluator:
+    def __init__(self, tickers, objective=backtest_objective, workers=None):
+        """
+        `objective(engines, genomes, **kwargs) -> scores` must be a module-level
+        function; it receives {ticker: QuantEngine} and a chunk of genome dicts.
+        """
+        self.tickers = list(tickers)
+        self.workers = workers or os.cpu_count() or 1
+        self._shared = []
+
+        layouts = []
+        for ticker in self.tickers:
+            engine = QuantEngine(ticker)
+            arrays = engine.market_arrays()
+            n_bars = len(engine.data)
+            shm = shared_memory.SharedMemory(create=True, size=len(MARKET_COLUMNS) * n_bars * 8)
+            block = np.ndarray((len(MARKET_COLUMNS), n_bars), dtype=np.float64, buffer=shm.buf)
+            for row, column in enumerate(MARKET_COLUMNS):
+                block[row] = arrays[column]
+            self._shared.append(shm)
+            layouts.append((ticker, shm.name, n_bars, engine.data.index))
+
+        self._pool = mp.Pool(processes=self.workers, initializer=_init_worker,
+                             initargs=(layouts, objective))
+
+    def map(self, genomes, **kwargs):
+        """
+        Scores `genomes` in order. Returns a list of floats.
+        Keyword arguments (e.g. `cutoff`) are forwarded to the objective.
+        """
+        genomes = list(genomes)
+        if not genomes:
+            return []
+        n_chunks = min(len(genomes), self.workers * 2)
+        bounds = np.linspace(0, len(genomes), n_chunks + 1).astype(int)
+        chunks = [(genomes[a:b], kwargs) for a, b in zip(bounds[:-1], bounds[1:])]
+        scores = []
+        for chunk_scores in self._pool.map(_evaluate_chunk, chunks):
+            scores.extend(chunk_scores)
+        return scores
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for shm in self._shared:
+            shm.close()
+            shm.unlink()
+        self._shared = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
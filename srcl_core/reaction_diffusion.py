@@ -8,6 +8,20 @@ import numpy as np
 from numba import njit, prange
 from tqdm import tqdm
 
+from srcl_core.metrics import density_entropy, rms_difference
+
+# Why evolve_until() stopped
+STOP_COMPLETED = 0
+STOP_STEADY = 1
+STOP_BLOWUP = 2
+STOP_REASONS = {STOP_COMPLETED: "completed", STOP_STEADY: "steady_state", STOP_BLOWUP: "blow_up"}
+
+CHECK_EVERY = 100 # Steps between convergence checks in run_simulation / run_ensemble (0 = never)
+# Steady state: no cell of U or V moved more than this in the checked step. 0 stops
+# only at exact fixed points (e.g. fully died-out runs), so results match a full run;
+# a positive tolerance stops sooner but dying runs then keep their last traces of V.
+STEADY_TOL = 0.0
+
 @njit(parallel=True)
 def laplacian(Z):
     """Compute discrete Laplacian using direct neighbor access (Numba-safe)."""
@@ -22,68 +36,167 @@ def laplacian(Z):
             )
     return L
 
-@njit
+@njit(inline="always")
+def _gray_scott_cell(U, V, U_out, V_out, i, j, Du, Dv, F, k, dt):
+    # Same arithmetic, and so the same results, as the array form of the
+    # update (the Laplacian is rounded to the field dtype, as it was when stored)
+    u = U[i, j]
+    v = V[i, j]
+    Lu = U.dtype.type(U[i - 1, j] + U[i + 1, j] + U[i, j - 1] + U[i, j + 1] - 4.0 * u)
+    Lv = V.dtype.type(V[i - 1, j] + V[i + 1, j] + V[i, j - 1] + V[i, j + 1] - 4.0 * v)
+    uvv = u * v * v
+    U_out[i, j] = u + (Du * Lu - uvv + F * (1 - u)) * dt
+    V_out[i, j] = v + (Dv * Lv + uvv - (F + k) * v) * dt
+
+@njit(inline="always")
+def _copy_boundary(Z):
+    # Boundary conditions (wraparound stabilization): rows first, then columns
+    n, m = Z.shape
+    for j in range(m):
+        Z[0, j] = Z[n - 2, j]
+        Z[n - 1, j] = Z[1, j]
+    for i in range(n):
+        Z[i, 0] = Z[i, m - 2]
+        Z[i, m - 1] = Z[i, 1]
+
+@njit(parallel=True, cache=True)
+def gray_scott_step(U, V, U_out, V_out, Du, Dv, F, k, dt):
+    """
+    One fused Gray-Scott step from (U, V) into (U_out, V_out): Laplacian,
+    reaction and boundary copy without temporaries.
+    """
+    n, m = U.shape
+    for i in prange(1, n - 1):
+        for j in range(1, m - 1):
+            _gray_scott_cell(U, V, U_out, V_out, i, j, Du, Dv, F, k, dt)
+    _copy_boundary(U_out)
+    _copy_boundary(V_out)
+
+@njit(inline="always")
+def _check_update(U, V, U_new, V_new, tol):
+    # STOP_BLOWUP on any non-finite cell, STOP_STEADY if max |update| <= tol
+    largest = 0.0
+    for i in range(U.shape[0]):
+        for j in range(U.shape[1]):
+            if not (np.isfinite(U_new[i, j]) and np.isfinite(V_new[i, j])):
+                return STOP_BLOWUP
+            largest = max(largest, abs(U_new[i, j] - U[i, j]), abs(V_new[i, j] - V[i, j]))
+    return STOP_STEADY if largest <= tol else STOP_COMPLETED
+
+@njit(cache=True)
+def evolve_until(U, V, Du, Dv, F, k, dt, steps, check_every=0, tol=0.0):
+    """
+    Advances U, V in place by up to `steps` steps, ping-ponging with one spare
+    pair of buffers. Every `check_every` steps (0 = never) the last step's
+    update is checked: the run stops on NaN/inf or when it is below `tol`.
+    Returns (steps run, STOP_* reason).
+    """
+    U_next = U.copy()
+    V_next = V.copy()
+    src_U, src_V, dst_U, dst_V = U, V, U_next, V_next
+    done = 0
+    reason = STOP_COMPLETED
+    while done < steps:
+        gray_scott_step(src_U, src_V, dst_U, dst_V, Du, Dv, F, k, dt)
+        done += 1
+        if check_every > 0 and done % check_every == 0:
+            reason = _check_update(src_U, src_V, dst_U, dst_V, tol)
+        src_U, src_V, dst_U, dst_V = dst_U, dst_V, src_U, src_V
+        if reason != STOP_COMPLETED:
+            break
+
+    if done % 2 == 1:
+        U[:, :] = U_next
+        V[:, :] = V_next
+    return done, reason
+
+@njit(cache=True)
 def evolve(U, V, Du, Dv, F, k, dt, steps):
-    for _ in range(steps):
-        Lu = laplacian(U)
-        Lv = laplacian(V)
-
-        # Gray-Scott equations
-        uvv = U * V * V
-        U += (Du * Lu - uvv + F * (1 - U)) * dt
-        V += (Dv * Lv + uvv - (F + k) * V) * dt
-
-        # Boundary conditions (wraparound stabilization)
-        U[0, :] = U[-2, :]
-        U[-1, :] = U[1, :]
-        U[:, 0] = U[:, -2]
-        U[:, -1] = U[:, 1]
-
-        V[0, :] = V[-2, :]
-        V[-1, :] = V[1, :]
-        V[:, 0] = V[:, -2]
-        V[:, -1] = V[:, 1]
+    """Advances U, V in place by `steps` steps."""
+    evolve_until(U, V, Du, Dv, F, k, dt, steps)
+    return U, V
 
+@njit(parallel=True, cache=True)
+def evolve_batch_until(U, V, Du, Dv, F, k, dt, steps, check_every=0, tol=0.0):
+    """
+    evolve_until() for (B, N, N) stacks with per-member Du/Dv/F/k vectors;
+    returns per-member (steps run, reason) arrays. Members are spread over
+    the cores and each runs (and stops) on its own ping-pong pair, so its
+    grid stays in that core's cache.
+    """
+    B, n, m = U.shape
+    U_next = U.copy()
+    V_next = V.copy()
+    done = np.zeros(B, dtype=np.int64)
+    reasons = np.zeros(B, dtype=np.int64)
+    for b in prange(B):
+        du, dv, f, kill = Du[b], Dv[b], F[b], k[b]
+        while done[b] < steps:
+            if done[b] % 2 == 0:
+                src_U, src_V, dst_U, dst_V = U[b], V[b], U_next[b], V_next[b]
+            else:
+                src_U, src_V, dst_U, dst_V = U_next[b], V_next[b], U[b], V[b]
+            for i in range(1, n - 1):
+                for j in range(1, m - 1):
+                    _gray_scott_cell(src_U, src_V, dst_U, dst_V, i, j, du, dv, f, kill, dt)
+            _copy_boundary(dst_U)
+            _copy_boundary(dst_V)
+            done[b] += 1
+            if check_every > 0 and done[b] % check_every == 0:
+                reasons[b] = _check_update(src_U, src_V, dst_U, dst_V, tol)
+                if reasons[b] != STOP_COMPLETED:
+                    break
+
+        if done[b] % 2 == 1:
+            U[b] = U_next[b]
+            V[b] = V_next[b]
+    return done, reasons
+
+@njit(cache=True)
+def evolve_batch(U, V, Du, Dv, F, k, dt, steps):
+    """evolve() for (B, N, N) stacks; Du/Dv/F/k are length-B arrays."""
+    evolve_batch_until(U, V, Du, Dv, F, k, dt, steps)
     return U, V
 
 def compute_entropy(U, V):
     """Entropy-like metric from the final concentration fields."""
-    UV = U + V
-    hist, _ = np.histogram(UV, bins=256, range=(0.0, 2.0), density=True)
-    hist += 1e-8  # prevent log(0)
-    return -np.sum(hist * np.log(hist))
+    return density_entropy(U + V, bins=256, range=(0.0, 2.0), eps=1e-8)  # eps prevents log(0)
 
 def compute_coherence(U, V):
     """Dummy coherence measure for now (L2 norm difference)."""
-    return np.sqrt(np.mean((U - V) ** 2))
+    return rms_difference(U, V)
 
-def run_simulation(N=128, Du=0.16, Dv=0.08, F=0.035, k=0.065, dt=1.0, steps=10000, seed_size=10):
-    U = np.ones((N, N), dtype=np.float32)
-    V = np.zeros((N, N), dtype=np.float32)
+def initial_fields(N=128, seed_size=10, batch=None):
+    """Uniform U=1, V=0 with a seeded square in the centre; (batch, N, N) if batch is given."""
+    shape = (N, N) if batch is None else (batch, N, N)
+    U = np.ones(shape, dtype=np.float32)
+    V = np.zeros(shape, dtype=np.float32)
 
     # Initial seeding
     center = N // 2
     r = seed_size // 2
-    U[center - r:center + r, center - r:center + r] = 0.50
-    V[center - r:center + r, center - r:center + r] = 0.25
+    U[..., center - r:center + r, center - r:center + r] = 0.50
+    V[..., center - r:center + r, center - r:center + r] = 0.25
+    return U, V
 
-    U, V = evolve(U, V, Du, Dv, F, k, dt, steps)
+def run_simulation(N=128, Du=0.16, Dv=0.08, F=0.035, k=0.065, dt=1.0, steps=10000, seed_size=10,
+                   check_every=CHECK_EVERY, tol=STEADY_TOL):
+    """Metrics of one run, plus the steps actually run and why it stopped (see evolve_until)."""
+    U, V = initial_fields(N, seed_size)
+    done, reason = evolve_until(U, V, Du, Dv, F, k, dt, steps, check_every, tol)
 
     return {
         "entropy": float(compute_entropy(U, V)),
-        "coherence": float(compute_coherence(U, V))
+        "coherence": float(compute_coherence(U, V)),
+        "steps": int(done),
+        "stop_reason": STOP_REASONS[reason]
     }
 
-def simulate(params=None):
-    """
-    Wrapper for SRCL Monte Carlo compatibility.
-    Accepts optional params dict for config overrides.
-    """
-    print("🔥 simulate() was called")
+def simulation_kwargs(params=None):
+    """run_simulation() arguments from a Monte Carlo params dict (size/du/dv/feed/kill/steps)."""
     if params is None:
         params = {}
-
-    return run_simulation(
+    return dict(
         N=params.get("size", 128),
         Du=params.get("du", 0.16),
         Dv=params.get("dv", 0.08),
@@ -94,3 +207,41 @@ def simulate(params=None):
         seed_size=10
     )
 
+def simulate(params=None):
+    """
+    Wrapper for SRCL Monte Carlo compatibility.
+    Accepts optional params dict for config overrides.
+    """
+    print("🔥 simulate() was called")
+    return run_simulation(**simulation_kwargs(params))
+
+def run_ensemble(param_table, check_every=CHECK_EVERY, tol=STEADY_TOL):
+    """
+    Batched simulate(): `param_table` is a list of params dicts (or a
+    DataFrame of them). Members sharing a grid size and step count are
+    stacked into one (B, N, N) array and advanced together by
+    evolve_batch_until; each member stops on its own. Returns the
+    run_simulation() results in table order, identical to calling
+    simulate() on each row.
+    """
+    if hasattr(param_table, "to_dict"):
+        param_table = param_table.to_dict("records")
+    members = [simulation_kwargs(params) for params in param_table]
+    groups = {}
+    for idx, kw in enumerate(members):
+        groups.setdefault((kw["N"], kw["steps"], kw["dt"], kw["seed_size"]), []).append(idx)
+
+    results = [None] * len(members)
+    for (N, steps, dt, seed_size), indices in groups.items():
+        U, V = initial_fields(N, seed_size, batch=len(indices))
+        Du, Dv, F, k = (np.array([members[i][key] for i in indices], dtype=np.float64)
+                        for key in ("Du", "Dv", "F", "k"))
+        done, reasons = evolve_batch_until(U, V, Du, Dv, F, k, dt, steps, check_every, tol)
+        for b, idx in enumerate(indices):
+            results[idx] = {
+                "entropy": float(compute_entropy(U[b], V[b])),
+                "coherence": float(compute_coherence(U[b], V[b])),
+                "steps": int(done[b]),
+                "stop_reason": STOP_REASONS[reasons[b]]
+            }
+    return results
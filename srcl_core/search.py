@@ -0,0 +1,260 @@
+"""
+SRCL ELITE - SEARCH BACKENDS
+----------------------------
+Array-encoded alternatives to the truncation GA.
+1. GenomeSpace maps rows of a (population x genes) matrix in the unit cube to
+   genome dicts, using the same ranges as the optimizers' random generators.
+2. DifferentialEvolution, CMAES and ElitistGA propose whole populations as
+   matrices (`ask`) and learn from their scores (`tell`); fitness is maximized.
+3. `evaluations_to_target` / `print_target_report` measure how many backtests
+   each run needed to reach a common fitness level.
+
+Usage:
+    strategy = CMAES(space, POPULATION_SIZE)
+    for gen in range(GENERATIONS):
+        genomes = space.decode(strategy.ask())
+        strategy.tell(score_fn(genomes))
+"""
+
+import numpy as np
+
+
+class GenomeSpace:
+    def __init__(self, bounds, integers=(), ratios=None):
+        """
+        `bounds` maps each gene to its (low, high) range. Genes in `integers`
+        are rounded. `ratios` maps a gene to its base gene: the encoded value
+        is then the multiple of the base (e.g. tp_multiplier = sl x ratio), so
+        range constraints between genes hold for every row.
+        """
+        self.names = list(bounds)
+        self.low = np.array([bounds[k][0] for k in self.names], dtype=np.float64)
+        self.high = np.array([bounds[k][1] for k in self.names], dtype=np.float64)
+        self.integers = set(integers)
+        self.ratios = dict(ratios or {})
+
+    @property
+    def dim(self):
+        return len(self.names)
+
+    def decode(self, matrix):
+        """Unit-cube rows -> list of genome dicts (rows are clipped to the box)."""
+        values = self.low + np.clip(matrix, 0.0, 1.0) * (self.high - self.low)
+        genomes = []
+        for row in values:
+            genome = dict(zip(self.names, row.tolist()))
+            for k in self.integers:
+                genome[k] = int(round(genome[k]))
+            for k, base in self.ratios.items():
+                genome[k] = genome[base] * genome[k]
+            genomes.append(genome)
+        return genomes
+
+
+class _Strategy:
+    def get_state(self):
+        """Arrays, scalars and RNG state needed to resume (see srcl_core.checkpoint)."""
+        state = {k: v for k, v in vars(self).items() if isinstance(v, (np.ndarray, float, int))}
+        state["rng"] = self.rng.bit_generator.state
+        return state
+
+    def set_state(self, state):
+        for k, v in state.items():
+            if k == "rng":
+                self.rng.bit_generator.state = v
+            else:
+                setattr(self, k, v)
+
+
+class DifferentialEvolution(_Strategy):
+    """
+    DE/rand/1/bin with a per-generation dithered F. Each trial row competes
+    only with its own parent, so the population never gets worse.
+    """
+
+    def __init__(self, space, pop_size, crossover=0.9, f_range=(0.5, 1.0), seed=None):
+        self.space = space
+        self.pop_size = pop_size
+        self.crossover = crossover
+        self.f_range = f_range
+        self.rng = np.random.default_rng(seed)
+        self.population = self.rng.random((pop_size, space.dim))
+        self.scores = None
+        self._trials = None
+
+    @property
+    def cutoff(self):
+        """A trial scoring below the worst parent cannot replace anything."""
+        return None if self.scores is None else float(self.scores.min())
+
+    def ask(self):
+        if self.scores is None:
+            self._trials = self.population.copy()
+            return self._trials
+
+        n, d = self.population.shape
+        # Three distinct donors per row, none equal to the row itself
+        donors = np.argsort(self.rng.random((n, n)) + np.eye(n), axis=1)[:, :3]
+        a, b, c = (self.population[donors[:, k]] for k in range(3))
+        mutant = a + self.rng.uniform(*self.f_range) * (b - c)
+
+        cross = self.rng.random((n, d)) < self.crossover
+        cross[np.arange(n), self.rng.integers(0, d, n)] = True
+        trials = np.where(cross, mutant, self.population)
+
+        # Out-of-box genes land halfway between the parent and the bound
+        trials = np.where(trials < 0.0, self.population / 2, trials)
+        trials = np.where(trials > 1.0, (self.population + 1.0) / 2, trials)
+        self._trials = trials
+        return trials
+
+    def tell(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        if self.scores is None:
+            self.scores = scores
+            return
+        better = scores >= self.scores
+        self.population[better] = self._trials[better]
+        self.scores[better] = scores[better]
+
+
+class CMAES(_Strategy):
+    """
+    (mu/mu_w, lambda) CMA-ES on the unit cube. Samples are repaired (clipped)
+    into the box before scoring and the update learns from the repaired
+    samples; without that the mean drifts onto flat out-of-box regions.
+    """
+
+    def __init__(self, space, pop_size, sigma=0.3, seed=None):
+        n = space.dim
+        self.space = space
+        self.pop_size = pop_size
+        self.rng = np.random.default_rng(seed)
+        self.mean = np.full(n, 0.5)
+        self.sigma = sigma
+        self.cutoff = None # Every sample is ranked, so nothing may be aborted
+
+        self.mu = pop_size // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        # Strategy parameters (Hansen, "The CMA Evolution Strategy: A Tutorial")
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.C = np.eye(n)
+        self.generation = 0
+        self._samples = None
+
+    def ask(self):
+        z = self.rng.standard_normal((self.pop_size, self.space.dim))
+        self._samples = np.clip(self.mean + self.sigma * (z * self.D) @ self.B.T, 0.0, 1.0)
+        return self._samples
+
+    def tell(self, scores):
+        n = self.space.dim
+        order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")[:self.mu]
+        steps = (self._samples[order] - self.mean) / self.sigma
+        step = self.weights @ steps
+        self.mean = self.mean + self.sigma * step
+        self.generation += 1
+
+        # Evolution paths
+        inv_sqrt_c = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * (inv_sqrt_c @ step)
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / np.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * step
+
+        # Covariance: rank-one + rank-mu update
+        rank_mu = (steps * self.weights[:, None]).T @ steps
+        self.C = (1 - self.c1 - self.cmu) * self.C \
+            + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C) \
+            + self.cmu * rank_mu
+        self.sigma *= np.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+
+        self.C = (self.C + self.C.T) / 2
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+
+class ElitistGA(_Strategy):
+    """
+    The optimizer agent's GA on the unit cube: the `elites` best rows survive,
+    each child averages two of the `parents` best rows and gets a uniform
+    +/- `mutation` nudge.
+    """
+
+    def __init__(self, space, pop_size, elites=2, parents=5, mutation=0.05, seed=None):
+        self.space = space
+        self.pop_size = pop_size
+        self.elites = elites
+        self.parents = parents
+        self.mutation = mutation
+        self.rng = np.random.default_rng(seed)
+        self.population = self.rng.random((pop_size, space.dim))
+        self.cutoff = None
+
+    def ask(self):
+        return self.population
+
+    def tell(self, scores):
+        ranked = self.population[np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")]
+        n_children = self.pop_size - self.elites
+        n_parents = min(self.parents, self.pop_size)
+        pairs = np.array([self.rng.choice(n_parents, 2, replace=False) for _ in range(n_children)])
+        children = ranked[pairs].mean(axis=1)
+        children += self.rng.uniform(-self.mutation, self.mutation, children.shape)
+        self.population = np.vstack([ranked[:self.elites], np.clip(children, 0.0, 1.0)])
+
+
+BACKENDS = {"de": DifferentialEvolution, "cmaes": CMAES}
+
+# QuantEngine strategy genome, same ranges as quant_optimizer.generate_skewed_genome;
+# tp_multiplier is encoded as a multiple of the stop
+STRATEGY_SPACE = GenomeSpace({
+    'w_trend': (0.4, 1.0),
+    'w_mean_rev': (0.4, 1.0),
+    'w_vol': (0.4, 1.0),
+    'rsi_period': (5, 20),
+    'buy_thresh': (0.05, 0.25),
+    'sell_thresh': (0.05, 0.25),
+    'sl_multiplier': (1.0, 3.0),
+    'tp_multiplier': (1.5, 4.0),
+}, integers=('rsi_period',), ratios={'tp_multiplier': 'sl_multiplier'})
+
+
+def evaluations_to_target(history, target):
+    """
+    `history` is a list of (evaluations so far, best score so far) pairs, one
+    per generation. Returns the evaluations needed to reach `target`, or None.
+    """
+    for evaluations, best in history:
+        if best >= target:
+            return evaluations
+    return None
+
+
+def print_target_report(histories, target=None):
+    """
+    Evaluations-to-target table for one or more runs ({name: history}).
+    The default target is the best score every run reached.
+    """
+    if target is None:
+        target = min(history[-1][1] for history in histories.values())
+    print(f"🎯 EVALUATIONS TO TARGET (fitness >= {target:.4f})")
+    for name, history in histories.items():
+        needed = evaluations_to_target(history, target)
+        total, best = history[-1]
+        reached = f"{needed:>6} evals" if needed is not None else "   not reached"
+        print(f"   {name:<6} {reached} | best {best:.4f} after {total} evals")
+    return target
@@ -1,99 +1,221 @@
 #!/usr/bin/env python3
 import numpy as np
 from tqdm import trange
-import json, os
+import os, sys
 import argparse
+from numba import njit, prange
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from srcl_core.metrics import gradient_coherence, shannon_entropy
+from srcl_core.metrics_sink import MetricsSink
 
 # ======================================================
 #  SRCL Environmental Ripple + Lyapunov & Entropy Engine
 # ======================================================
-
-# --- Command-line argument parser ---
-parser = argparse.ArgumentParser(description="SRCL Environmental Ripple Simulation")
-parser.add_argument("--alpha", type=float, default=0.08, help="reaction rate alpha")
-parser.add_argument("--beta", type=float, default=0.1, help="reaction rate beta")
-parser.add_argument("--gamma", type=float, default=0.6, help="coupling rate gamma")
-parser.add_argument("--D", type=float, default=0.9, help="diffusion coefficient")
-parser.add_argument("--log", type=str, default="data/logs/metrics_log.jsonl", help="path to save metrics log")
-args = parser.parse_args()
+# Importable: run_ripple(params, steps, size) -> per-step metrics, and
+# run_ripple_ensemble(param_table, steps, size) for batches of parameter sets.
+# The command line below is a thin wrapper around it.
 
 # --- Simulation constants ---
-size = 200
-steps = 1000
-alpha, beta, gamma, D = args.alpha, args.beta, args.gamma, args.D
+DEFAULT_PARAMS = {"alpha": 0.08, "beta": 0.1, "gamma": 0.6, "D": 0.9}
+# Parameter ranges explored by the Monte Carlo engine and the optimizer agent
+PARAM_RANGES = {
+    "alpha": (0.05, 0.12),
+    "beta":  (0.08, 0.12),
+    "gamma": (0.3, 0.9),
+    "D":     (0.6, 1.0),
+}
 Da, Db, De = 1.0, 0.5, 0.25
 feed, kill = 0.055, 0.062
 env_coupling = 0.05
 
-# --- Initialize fields ---
-A = np.ones((size, size))
-B = np.zeros((size, size))
-E = np.zeros((size, size))
-
-# initial condition blob
-A[size//2-5:size//2+5, size//2-5:size//2+5] = 0.5
-B[size//2-5:size//2+5, size//2-5:size//2+5] = 0.25
-
 # --- Metrics ---
 def coherence(field):
-    gx, gy = np.gradient(field)
-    return float(np.mean(np.sqrt(gx**2 + gy**2)))
+    return gradient_coherence(field)
 
 def entropy(field):
-    hist, _ = np.histogram(field, bins=100, range=(0, 1))
-    p = hist / np.sum(hist)
-    p = p[p > 0]
-    return float(-np.sum(p * np.log2(p)))
+    return shannon_entropy(field, bins=100, range=(0, 1))
 
 # --- Environmental driver ---
 def environment_wave(t):
     return np.sin(t / 50.0) * env_coupling
 
-# --- Ensure log directory exists ---
-os.makedirs(os.path.dirname(args.log), exist_ok=True)
-
-# --- Simulation loop ---
-for t in trange(steps, desc="🌊 Simulating Environmental Ripple"):
-    # Laplacian diffusion for A, B
-    laplace_A = (
-        np.roll(A, 1, 0) + np.roll(A, -1, 0) +
-        np.roll(A, 1, 1) + np.roll(A, -1, 1) - 4 * A
-    )
-    laplace_B = (
-        np.roll(B, 1, 0) + np.roll(B, -1, 0) +
-        np.roll(B, 1, 1) + np.roll(B, -1, 1) - 4 * B
-    )
-
-    # Reaction-diffusion updates
-    dA = Da * laplace_A - A * B**2 + feed * (1 - A)
-    dB = Db * laplace_B + A * B**2 - (kill + feed) * B
-
-    # Update with time step
-    A += dA * 0.1
-    B += dB * 0.1
-
-    # Environmental wave coupling
-    E = environment_wave(t) * np.ones_like(E)
-    A += gamma * E
-
-    # Clamp for numerical stability
-    A = np.clip(A, 0, 1)
-    B = np.clip(B, 0, 1)
-
-    # Compute metrics
-    metrics = {
-        "step": t,
-        "coherence_A": coherence(A),
-        "entropy_A": entropy(A),
-        "alpha": alpha,
-        "beta": beta,
-        "gamma": gamma,
-        "D": D
+
+@njit(inline="always")
+def _ripple_cell(A, B, A_out, B_out, i, j, im, ip, Da, Db, feed, kill, coupling):
+    m = A.shape[1]
+    jm = j - 1 if j > 0 else m - 1
+    jp = j + 1 if j < m - 1 else 0
+    # Same operation order as the np.roll form, so the same results
+    a = A[i, j]
+    b = B[i, j]
+    laplace_a = A[im, j] + A[ip, j] + A[i, jm] + A[i, jp] - 4 * a
+    laplace_b = B[im, j] + B[ip, j] + B[i, jm] + B[i, jp] - 4 * b
+    abb = a * b**2
+    a_new = a + (Da * laplace_a - abb + feed * (1 - a)) * 0.1
+    b_new = b + (Db * laplace_b + abb - (kill + feed) * b) * 0.1
+    a_new = a_new + coupling
+    A_out[i, j] = min(max(a_new, 0.0), 1.0)
+    B_out[i, j] = min(max(b_new, 0.0), 1.0)
+
+
+@njit(parallel=True, cache=True)
+def ripple_step(A, B, A_out, B_out, Da, Db, feed, kill, coupling):
+    """
+    One fused ripple step from (A, B) into (A_out, B_out): periodic 5-point
+    Laplacians, reaction, the uniform environment term `coupling`
+    (gamma * wave) and the [0, 1] clamp, without temporaries.
+    """
+    n, m = A.shape
+    for i in prange(n):
+        im = i - 1 if i > 0 else n - 1
+        ip = i + 1 if i < n - 1 else 0
+        for j in range(m):
+            _ripple_cell(A, B, A_out, B_out, i, j, im, ip, Da, Db, feed, kill, coupling)
+
+
+@njit(parallel=True, cache=True)
+def ripple_batch_step(A, B, A_out, B_out, Da, Db, feed, kill, coupling):
+    """ripple_step() for (members, N, N) stacks with a per-member `coupling` vector; members run in parallel."""
+    members, n, m = A.shape
+    for b in prange(members):
+        A_b, B_b, A_out_b, B_out_b, c = A[b], B[b], A_out[b], B_out[b], coupling[b]
+        for i in range(n):
+            im = i - 1 if i > 0 else n - 1
+            ip = i + 1 if i < n - 1 else 0
+            for j in range(m):
+                _ripple_cell(A_b, B_b, A_out_b, B_out_b, i, j, im, ip, Da, Db, feed, kill, c)
+
+
+def initial_fields(size=200):
+    A = np.ones((size, size))
+    B = np.zeros((size, size))
+
+    # initial condition blob
+    A[size//2-5:size//2+5, size//2-5:size//2+5] = 0.5
+    B[size//2-5:size//2+5, size//2-5:size//2+5] = 0.25
+    return A, B
+
+
+def run_ripple(params=None, steps=1000, size=200, log_path=None, progress=False, every=1, log_format=None):
+    """
+    Runs one ripple simulation in-process and returns its metrics rows (a
+    list of dicts, the rows of the log), sampled every `every` steps plus the
+    final step. `params` overrides DEFAULT_PARAMS; rows are also written to
+    `log_path` if given (format from the extension or `log_format`, see
+    srcl_core.metrics_sink).
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    alpha, beta, gamma, D = (params[k] for k in ("alpha", "beta", "gamma", "D"))
+
+    # --- Initialize fields (plus the buffers each step writes into) ---
+    A, B = initial_fields(size)
+    A_next, B_next = np.empty_like(A), np.empty_like(B)
+
+    rows = []
+    sink = MetricsSink(log_path, log_format, every)
+    steps_iter = trange(steps, desc="🌊 Simulating Environmental Ripple") if progress else range(steps)
+    with sink:
+        for t in steps_iter:
+            # Diffusion, reaction, environmental wave coupling and clamp in one pass
+            ripple_step(A, B, A_next, B_next, Da, Db, feed, kill, gamma * environment_wave(t))
+            A, A_next = A_next, A
+            B, B_next = B_next, B
+            if not sink.due(t, steps):
+                continue
+
+            # Compute metrics
+            metrics = {
+                "step": t,
+                "coherence_A": coherence(A),
+                "entropy_A": entropy(A),
+                "alpha": alpha,
+                "beta": beta,
+                "gamma": gamma,
+                "D": D
+            }
+            rows.append(metrics)
+            sink.write(metrics) # Buffered; flushed in batches and on exit
+
+    return rows
+
+
+def run_ripple_ensemble(param_table, steps=1000, size=200, every=1, traces=False):
+    """
+    Advances one ripple simulation per row of `param_table` together, as
+    (members, N, N) stacks with a per-member gamma (alpha, beta and D only
+    label a run). Returns one summarize() dict per member, equal to
+    summarize(run_ripple(params, steps, size, every=every)). With `traces`,
+    returns (summaries, trace): trace["step"] are the sampled steps and
+    trace["coherence_A"] / trace["entropy_A"] are (members, samples) arrays.
+    """
+    params = [{**DEFAULT_PARAMS, **p} for p in param_table]
+    members = len(params)
+    if members == 0:
+        return ([], None) if traces else []
+    gamma = np.array([p["gamma"] for p in params], dtype=np.float64)
+
+    A0, B0 = initial_fields(size)
+    A = np.repeat(A0[None], members, axis=0)
+    B = np.repeat(B0[None], members, axis=0)
+    A_next, B_next = np.empty_like(A), np.empty_like(B)
+
+    sampling = MetricsSink(every=every)
+    sampled_steps = np.array([t for t in range(steps) if sampling.due(t, steps)], dtype=np.int64)
+    samples = len(sampled_steps)
+    # (members, samples): each member's trace is contiguous, so its mean sums
+    # in the same order as summarize() does
+    coherence_trace = np.empty((members, samples))
+    entropy_trace = np.empty((members, samples))
+    k = 0
+    for t in range(steps):
+        ripple_batch_step(A, B, A_next, B_next, Da, Db, feed, kill, gamma * environment_wave(t))
+        A, A_next = A_next, A
+        B, B_next = B_next, B
+        if sampling.due(t, steps):
+            coherence_trace[:, k] = coherence(A)
+            entropy_trace[:, k] = entropy(A)
+            k += 1
+
+    if samples == 0:
+        summaries = [None] * members
+    else:
+        coherence_mean = coherence_trace.mean(axis=1)
+        entropy_mean = entropy_trace.mean(axis=1)
+        summaries = [{"coherence": float(c), "entropy": float(e)} for c, e in zip(coherence_mean, entropy_mean)]
+    if traces:
+        return summaries, {"step": sampled_steps, "coherence_A": coherence_trace, "entropy_A": entropy_trace}
+    return summaries
+
+
+def summarize(rows):
+    """Mean coherence / entropy of field A over a run, or None for an empty run."""
+    if not rows:
+        return None
+    return {
+        "coherence": float(np.mean([r["coherence_A"] for r in rows])),
+        "entropy": float(np.mean([r["entropy_A"] for r in rows])),
     }
 
-    # Save metrics incrementally
-    with open(args.log, "a") as f:
-        json.dump(metrics, f)
-        f.write("\n")
 
-print(f"\n✅ Simulation complete. Log saved to: {args.log}")
+def main():
+    # --- Command-line argument parser ---
+    parser = argparse.ArgumentParser(description="SRCL Environmental Ripple Simulation")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_PARAMS["alpha"], help="reaction rate alpha")
+    parser.add_argument("--beta", type=float, default=DEFAULT_PARAMS["beta"], help="reaction rate beta")
+    parser.add_argument("--gamma", type=float, default=DEFAULT_PARAMS["gamma"], help="coupling rate gamma")
+    parser.add_argument("--D", type=float, default=DEFAULT_PARAMS["D"], help="diffusion coefficient")
+    parser.add_argument("--steps", type=int, default=1000, help="number of time steps")
+    parser.add_argument("--size", type=int, default=200, help="grid size")
+    parser.add_argument("--log", type=str, default="data/logs/metrics_log.jsonl",
+                        help="path to save metrics log (.jsonl, .bin or .parquet)")
+    parser.add_argument("--every", type=int, default=1, help="log metrics every N steps (the final step is always logged)")
+    args = parser.parse_args()
+
+    params = {"alpha": args.alpha, "beta": args.beta, "gamma": args.gamma, "D": args.D}
+    run_ripple(params, args.steps, args.size, log_path=args.log, progress=True, every=args.every)
+    print(f"\n✅ Simulation complete. Log saved to: {args.log}")
+
+
+if __name__ == "__main__":
+    main()
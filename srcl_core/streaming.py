@@ -0,0 +1,217 @@
+"""
+SRCL ELITE - STREAMING STATE
+----------------------------
+Bar-by-bar QuantEngine for live trading.
+1. StreamState keeps ring buffers for the SMA 20/50/200, RSI and 20d
+   volatility windows plus the open position (entry, stop, target).
+2. update() ingests one close in O(1) and runs `_bar_step`, the same step
+   the backtest kernel runs, so live and historical decisions cannot drift.
+3. save()/load() snapshot the whole state to JSON, so a live process only
+   ingests the bars it has not seen yet.
+
+Indicator values match the rolling pandas versions used by QuantEngine up to
+floating-point rounding.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from srcl_core.backtest_engine import (
+    _bar_step, _genes, VOL_CEILING, EVENT_NONE, EVENT_ENTRY, EVENT_STOP, EVENT_TARGET, EVENT_SIGNAL_EXIT,
+)
+
+ACTIONS = {
+    EVENT_ENTRY: "BUY",
+    EVENT_STOP: "STOP LOSS",
+    EVENT_TARGET: "TAKE PROFIT",
+    EVENT_SIGNAL_EXIT: "SELL",
+}
+
+
+class RollingWindow:
+    """Fixed-size ring buffer with running sum and sum of squares."""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.count = 0
+        self.pos = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, x):
+        old = self.values[self.pos] # 0.0 until the window is full
+        self.values[self.pos] = x
+        self.total += x - old
+        self.total_sq += x * x - old * old
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        if self.pos == 0:
+            # Re-sum once per lap so rounding error cannot accumulate
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else math.nan
+
+    def std(self):
+        """Sample standard deviation (ddof=1), like pandas rolling().std()."""
+        if not self.full:
+            return math.nan
+        var = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, d):
+        window = cls(d["size"])
+        window.__dict__.update(d)
+        return window
+
+
+class StreamState:
+    def __init__(self, params):
+        self.params = dict(params)
+        self.genes = _genes(params)
+        self.rsi_period = self.genes['rsi_period']
+
+        # Indicator windows
+        self.sma_fast = RollingWindow(20)
+        self.sma_slow = RollingWindow(50)
+        self.sma_regime = RollingWindow(200)
+        self.gains = RollingWindow(self.rsi_period)
+        self.losses = RollingWindow(self.rsi_period)
+        self.log_returns = RollingWindow(20)
+        self.last_close = math.nan
+        self.last_time = None
+        self.bars = 0
+
+        # Position state, as in the backtest kernel
+        self.balance = 1000.0
+        self.position = 0
+        self.entry_price = 0.0
+        self.stop_price = 0.0
+        self.target_price = 0.0
+        self.trades = 0
+
+    @classmethod
+    def from_history(cls, params, closes, times=None):
+        """Replays a close series, leaving the state where a backtest over it would end."""
+        state = cls(params)
+        times = [None] * len(closes) if times is None else times
+        for close, time in zip(closes, times):
+            state.update(close, time)
+        return state
+
+    @classmethod
+    def from_engine(cls, engine, params):
+        """Warms up on a QuantEngine's history (the data the strategy was tuned on)."""
+        return cls.from_history(params, engine.market_arrays()['Close'], [str(t) for t in engine.data.index])
+
+    def _push_close(self, close):
+        if self.bars == 0:
+            # First bar: pandas diff() is NaN there and counts as zero gain/loss
+            delta = math.nan
+        else:
+            delta = close - self.last_close
+            self.log_returns.push(math.log(close / self.last_close))
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+        self.sma_fast.push(close)
+        self.sma_slow.push(close)
+        self.sma_regime.push(close)
+        self.last_close = close
+        self.bars += 1
+
+    def _rsi(self):
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if loss > 0:
+            return 100 - (100 / (1 + gain / loss))
+        if gain > 0:
+            return 100.0
+        return math.nan
+
+    def update(self, close, time=None):
+        """
+        Ingests one bar's close and runs one execution step.
+        Returns a dict with the indicators, the signal and `action`: BUY,
+        SELL, STOP LOSS, TAKE PROFIT, or HOLD/CASH when the position is unchanged.
+        """
+        close = float(close)
+        self._push_close(close)
+        self.last_time = time
+
+        sma_200 = self.sma_regime.mean()
+        rsi = self._rsi()
+        volatility = self.log_returns.std() * np.sqrt(252)
+
+        # Same votes as QuantEngine._base_signals / _rsi_signal
+        trend_signal = 1.0 if self.sma_fast.mean() > self.sma_slow.mean() else -1.0
+        vol_signal = -1.0 if volatility > VOL_CEILING else 1.0
+        rsi_signal = (50 - rsi) / 50
+        genes = self.genes
+        signal = (genes['w_trend'] * trend_signal) + (genes['w_mean_rev'] * rsi_signal) + (genes['w_vol'] * vol_signal)
+
+        (self.balance, self.position, self.entry_price, self.stop_price, self.target_price,
+         event, equity) = _bar_step(
+            close, sma_200, close * volatility, signal,
+            genes['buy_thresh'], genes['sell_thresh'], genes['sl_mult'], genes['tp_mult'],
+            self.balance, self.position, self.entry_price, self.stop_price, self.target_price
+        )
+        if event not in (EVENT_NONE, EVENT_ENTRY):
+            self.trades += 1
+
+        return {
+            "time": time,
+            "price": close,
+            "sma_200": sma_200,
+            "rsi": rsi,
+            "volatility": volatility,
+            "signal": signal,
+            "bull_regime": close > sma_200,
+            "action": ACTIONS.get(event, "HOLD" if self.position == 1 else "CASH"),
+            "position": self.position,
+            "entry": self.entry_price,
+            "stop": self.stop_price,
+            "target": self.target_price,
+            "equity": equity,
+        }
+
+    def copy(self):
+        return StreamState.from_dict(self.to_dict())
+
+    def to_dict(self):
+        d = {k: v for k, v in vars(self).items() if not isinstance(v, RollingWindow)}
+        d["windows"] = {k: v.to_dict() for k, v in vars(self).items() if isinstance(v, RollingWindow)}
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        windows = d.pop("windows")
+        state = cls(d["params"])
+        state.__dict__.update(d)
+        for name, window in windows.items():
+            setattr(state, name, RollingWindow.from_dict(window))
+        return state
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,113 @@
+"""
+SRCL ELITE - SURROGATE PRE-SCREENING
+------------------------------------
+Cheap fitness model that decides which new genomes deserve a backtest.
+1. A ridge regression on quadratic gene features is fitted to the archive of
+   (genome, fitness) pairs the optimizer has already paid for. It predicts
+   fitness *rank*, so dead-strategy scores (-999) do not dominate the fit.
+2. Each generation only the best-predicted `keep` fraction of unseen genomes
+   is backtested; the rest score SCREENED_SCORE and lose every selection.
+3. `last_rank_corr` is the Spearman correlation between prediction and true
+   fitness on the genomes just backtested (out of sample), so the log shows
+   whether the surrogate is helping.
+"""
+
+import math
+
+import numpy as np
+from scipy.stats import rankdata, spearmanr
+
+SCREENED_SCORE = -np.inf
+
+
+class Surrogate:
+    def __init__(self, keep=0.5, min_archive=100, max_archive=5000, ridge=1e-2):
+        self.keep = keep
+        self.min_archive = min_archive
+        self.max_archive = max_archive
+        self.ridge = ridge
+        self.names = None
+        self.genes = []
+        self.scores = []
+        self.last_rank_corr = None
+        self.last_screened = 0
+        self._coef = None
+
+    @property
+    def ready(self):
+        return len(self.scores) >= self.min_archive
+
+    def add(self, genomes, scores):
+        for genome, score in zip(genomes, scores):
+            if self.names is None:
+                self.names = list(genome)
+            self.genes.append([genome[k] for k in self.names])
+            self.scores.append(score)
+        del self.genes[:-self.max_archive], self.scores[:-self.max_archive]
+        self._coef = None
+
+    def get_state(self):
+        """Archive for optimizer checkpoints (see srcl_core.checkpoint)."""
+        return {"names": self.names, "archive": np.array(self.genes), "archive_scores": np.array(self.scores)}
+
+    def set_state(self, state):
+        self.names = state["names"]
+        self.genes = state["archive"].tolist()
+        self.scores = state["archive_scores"].tolist()
+        self._coef = None
+
+    def _features(self, matrix):
+        # Genes scaled to the archive's range, then [1, x, x^2, x_i * x_j]
+        x = (matrix - self._low) / self._span
+        i, j = np.triu_indices(x.shape[1], k=1)
+        return np.hstack([np.ones((len(x), 1)), x, x ** 2, x[:, i] * x[:, j]])
+
+    def fit(self):
+        genes = np.array(self.genes, dtype=np.float64)
+        self._low = genes.min(axis=0)
+        self._span = np.maximum(genes.max(axis=0) - self._low, 1e-12)
+        features = self._features(genes)
+        # Tied scores (e.g. every dead strategy) share one target rank
+        ranks = rankdata(self.scores) / len(self.scores)
+
+        # Ridge via least squares on [X; sqrt(lambda) I]
+        n_features = features.shape[1]
+        lhs = np.vstack([features, math.sqrt(self.ridge) * np.eye(n_features)])
+        rhs = np.concatenate([ranks, np.zeros(n_features)])
+        self._coef = np.linalg.lstsq(lhs, rhs, rcond=None)[0]
+
+    def predict(self, genomes):
+        if self._coef is None:
+            self.fit()
+        matrix = np.array([[g[k] for k in self.names] for g in genomes], dtype=np.float64)
+        return self._features(matrix) @ self._coef
+
+    def evaluate(self, population, cache, score_fn):
+        """
+        Drop-in for `cache.evaluate(population, score_fn)`. Once the archive
+        is big enough, only the top `keep` fraction of genomes the cache has
+        not seen are backtested; the others get SCREENED_SCORE (not cached).
+        """
+        unseen = list({cache.key(g): g for g in population if cache.get(g) is None}.values())
+        screened_keys = set()
+        predictions = None
+        if self.ready and unseen:
+            predictions = self.predict(unseen)
+            n_keep = max(1, math.ceil(self.keep * len(unseen)))
+            order = np.argsort(-predictions, kind="stable")
+            screened_keys = {cache.key(unseen[i]) for i in order[n_keep:]}
+
+        kept = [g for g in population if cache.key(g) not in screened_keys]
+        scores = iter(cache.evaluate(kept, score_fn))
+        result = [SCREENED_SCORE if cache.key(g) in screened_keys else next(scores) for g in population]
+
+        # Learn from what was just paid for; check the predictions against it first
+        fresh = [(i, g) for i, g in enumerate(unseen) if cache.key(g) not in screened_keys]
+        fresh_scores = [cache.get(g) for _, g in fresh]
+        self.last_screened = len(screened_keys)
+        self.last_rank_corr = None
+        if predictions is not None and len(fresh) > 2 and np.ptp(fresh_scores) > 0:
+            rho = spearmanr(predictions[[i for i, _ in fresh]], fresh_scores)[0]
+            self.last_rank_corr = None if np.isnan(rho) else float(rho)
+        self.add([g for _, g in fresh], fresh_scores)
+        return result
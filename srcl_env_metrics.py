@@ -1,14 +1,12 @@
 import numpy as np
 import json, os
+from srcl_core.metrics import gradient_coherence, density_entropy
 
 def coherence(field):
-    gx, gy = np.gradient(field)
-    return float(np.mean(np.sqrt(gx**2 + gy**2)))
+    return gradient_coherence(field)
 
 def entropy(field, bins=50):
-    hist, _ = np.histogram(field, bins=bins, density=True)
-    hist = hist[hist > 0]
-    return float(-np.sum(hist * np.log(hist)))
+    return density_entropy(field, bins=bins)
 
 def log_metrics(step, A, B, E, env_wave, outdir):
     metrics = {
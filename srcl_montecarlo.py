@@ -3,7 +3,7 @@ import json
 import os
 import random
 from datetime import datetime
-from srcl_core.reaction_diffusion import simulate
+from srcl_core.reaction_diffusion import run_ensemble
 
 LOG_PATH = "data/logs/reaction_output.jsonl"
 NUM_RUNS = 25
@@ -27,17 +27,19 @@ def random_params():
 
 def main():
     ensure_log_path()
-    for i in range(NUM_RUNS):
-        params = random_params()
-        result = simulate(params)
-
+    # All runs share a grid size, so they advance together as one (B, N, N) batch
+    param_table = [random_params() for _ in range(NUM_RUNS)]
+    results = run_ensemble(param_table)
+    for i, (params, result) in enumerate(zip(param_table, results)):
         log_entry = {
             "timestamp": datetime.utcnow().isoformat(),
             "run_id": f"srcl_{i:03d}",
             "parameters": params,
             "metrics": {
                 "entropy": result["entropy"],
-                "coherence": result["coherence"]
+                "coherence": result["coherence"],
+                "steps": result["steps"],
+                "stop_reason": result["stop_reason"]
             }
         }
 
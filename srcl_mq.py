@@ -4,15 +4,18 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from scipy.ndimage import laplace
 from pathlib import Path
+from srcl_core.spectral import SpectralIntegrator
 
 def run_srcl_mq(
     grid=150, steps=600,
     D=0.15, alpha=0.25, beta=1.0, gamma=0.3,
-    omega=2.0, dt=0.015, noise=0.03
+    omega=2.0, dt=0.015, noise=0.03, method="euler", plot_every=100
 ):
     """
     SRCL-MQ: Hybrid Memory-Quantum Continuity Field.
     Combines real-valued memory M with complex wave ψ.
+    method="spectral" integrates D∇²ψ - αψ + iωψ exactly (srcl_core.spectral).
+    Returns the final (ψ, M, R).
     """
 
     results_dir = Path("~/origin/continuity_lab/results_srclmq").expanduser()
@@ -25,9 +28,9 @@ def run_srcl_mq(
     R = np.zeros((grid, grid))
 
     print(f"🧩 Starting SRCL-MQ simulation: grid={grid}, steps={steps}")
+    spectral = SpectralIntegrator(psi.shape, dt, D, 1j*omega - alpha, real=False) if method == "spectral" else None
 
     for t in range(steps):
-        lap_psi = laplace(psi, mode="wrap")
         gradx, grady = np.gradient(np.angle(psi))
         coherence = np.exp(-0.5*(gradx**2 + grady**2))
 
@@ -35,20 +38,23 @@ def run_srcl_mq(
         R += dt * dR
         M = 0.97*M + 0.03*np.abs(psi)
 
-        dpsi = (
-            1j*omega*psi
-            + D*lap_psi
-            - alpha*psi
-            + beta*np.abs(psi)**2*psi
-            + 0.1j*R*psi
-            + 0.05*M*psi
-        )
-
         noise_term = noise*(np.random.randn(*psi.shape)+1j*np.random.randn(*psi.shape))
-        psi += dt*dpsi + noise_term*dt
+        if spectral:
+            psi = spectral.step(psi, beta*np.abs(psi)**2*psi + 0.1j*R*psi + 0.05*M*psi + noise_term)
+        else:
+            lap_psi = laplace(psi, mode="wrap")
+            dpsi = (
+                1j*omega*psi
+                + D*lap_psi
+                - alpha*psi
+                + beta*np.abs(psi)**2*psi
+                + 0.1j*R*psi
+                + 0.05*M*psi
+            )
+            psi += dt*dpsi + noise_term*dt
         psi /= (1e-8 + np.max(np.abs(psi)))
 
-        if t % 100 == 0:
+        if plot_every and t % plot_every == 0:
             print(f"🔁 Step {t}/{steps}")
             fig, ax = plt.subplots(1, 3, figsize=(11, 4))
             ax[0].imshow(np.abs(psi), cmap="inferno")
@@ -62,6 +68,7 @@ def run_srcl_mq(
             plt.close(fig)
 
     print("✅ SRCL-MQ complete!  Check ~/origin/continuity_lab/results_srclmq for images.")
+    return psi, M, R
 
 if __name__ == "__main__":
     run_srcl_mq()
@@ -4,11 +4,12 @@ matplotlib.use("Agg")  # run headless, no GUI
 import matplotlib.pyplot as plt
 from scipy.ndimage import laplace
 from pathlib import Path
+from srcl_core.spectral import SpectralIntegrator
 
 def run_srcl_quantum(
     grid=150, steps=600,
     D=0.15, alpha=0.25, beta=1.0, gamma=0.3, omega=2.0,
-    dt=0.015, noise=0.03
+    dt=0.015, noise=0.03, method="euler", plot_every=100
 ):
     """
     SRCL-Q: Self-Referential Continuity Lattice – Quantum Drift Variant.
@@ -27,8 +28,10 @@ def run_srcl_quantum(
 
     print(f"⚛️  Starting SRCL-Q simulation: grid={grid}, steps={steps}")
 
+    # method="spectral": D∇²ψ - αψ + iωψ exactly in Fourier space (srcl_core.spectral)
+    spectral = SpectralIntegrator(psi.shape, dt, D, 1j * omega - alpha, real=False) if method == "spectral" else None
+
     for t in range(steps):
-        lap_psi = laplace(psi, mode="wrap")
 
         # Phase gradients → local “current” magnitude
         gradx, grady = np.gradient(np.angle(psi))
@@ -39,21 +42,24 @@ def run_srcl_quantum(
         R += dt * dR
 
         # Core evolution equation
-        dpsi = (
-            1j * omega * psi
-            + D * lap_psi
-            - alpha * psi
-            + beta * np.abs(psi)**2 * psi
-            + 0.1j * R * psi
-        )
-
         # Complex noise → decoherence term
         noise_term = noise * (np.random.randn(*psi.shape) + 1j * np.random.randn(*psi.shape))
-        psi += dt * dpsi + noise_term * dt
+        if spectral:
+            psi = spectral.step(psi, beta * np.abs(psi)**2 * psi + 0.1j * R * psi + noise_term)
+        else:
+            lap_psi = laplace(psi, mode="wrap")
+            dpsi = (
+                1j * omega * psi
+                + D * lap_psi
+                - alpha * psi
+                + beta * np.abs(psi)**2 * psi
+                + 0.1j * R * psi
+            )
+            psi += dt * dpsi + noise_term * dt
 
         psi /= (1e-8 + np.max(np.abs(psi)))  # normalize
 
-        if t % 100 == 0:
+        if plot_every and t % plot_every == 0:
             print(f"🌊  Step {t}/{steps}")
             fig, ax = plt.subplots(1, 3, figsize=(11, 4))
 
@@ -74,6 +80,7 @@ def run_srcl_quantum(
             plt.close(fig)
 
     print("✅  SRCL-Q complete!  See ~/origin/continuity_lab/results_srclq for images.")
+    return psi, R
 
 if __name__ == "__main__":
     run_srcl_quantum()
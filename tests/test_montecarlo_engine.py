@@ -0,0 +1,25 @@
+import importlib
+import sys
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+
+matplotlib.use("Agg")
+sys.path.append(str(Path(__file__).resolve().parent.parent / "montecarlo"))
+
+
+def test_default_config_runs(tmp_path, monkeypatch):
+    # Shipped settings (STORE_TRACES off, ...), only the workload shrunk
+    monkeypatch.chdir(tmp_path)
+    engine = importlib.import_module("srcl_montecarlo_engine")
+    monkeypatch.setattr(engine, "MONTE_CARLO_RUNS", 3)
+    monkeypatch.setattr(engine, "STEPS", 5)
+    monkeypatch.setattr(engine, "SIZE", 16)
+
+    engine.run_montecarlo()
+
+    results = pd.read_csv(engine.OUTPUT_DIR / "srcl_montecarlo_results.csv")
+    assert list(results.columns) == [*engine.RANGES, "coherence", "entropy"]
+    assert len(results) == 3
+    assert not (engine.STORE_DIR / "traces").exists()